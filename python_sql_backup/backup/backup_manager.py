@@ -2,16 +2,29 @@
 Backup manager module for MySQL backup operations using XtraBackup.
 """
 import os
+import json
+import hashlib
 import time
 import shutil
 import logging
 import subprocess
 import tarfile
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple, Union
+import tempfile
+from datetime import datetime
+from typing import List, Dict, Optional, Set, Tuple, Union
 
 from python_sql_backup.config.config_manager import ConfigManager
-from python_sql_backup.utils.common import ensure_dir, get_mysql_connection
+from python_sql_backup.utils.common import (
+    ARCHIVE_SUFFIXES, ensure_dir, get_mysql_connection, get_directory_size, get_flat_directory_size,
+    is_tool_available, run_parallel, strip_archive_suffix
+)
+
+
+# 备份目录名称的类型前缀（即第一个'_'之前的部分）
+_BACKUP_PREFIXES = frozenset({'full', 'incremental', 'binlog'})
+
+# 备份元数据索引文件名（JSON Lines格式，位于备份根目录下）
+INDEX_FILE_NAME = '.backup_index.jsonl'
 
 
 class BackupManager:
@@ -31,7 +44,10 @@ class BackupManager:
         self.backup_format = self.config.get('BACKUP', 'backup_format', fallback='%Y%m%d_%H%M%S')
         self.threads = int(self.config.get('BACKUP', 'threads', fallback='4'))
         self.compress = self.config.get('BACKUP', 'compress', fallback='true').lower() == 'true'
+        self.compression = self.config.get('BACKUP', 'compression', fallback='gzip').lower()
         self.use_dated_dirs = self.config.get('BACKUP', 'use_dated_dirs', fallback='true').lower() == 'true'
+        self.archive_after_backup = self.config.get('BACKUP', 'archive_after_backup', fallback='false').lower() == 'true'
+        self._db_config = dict(self.config.get_section('DATABASE'))
         
         # Ensure backup directory exists
         ensure_dir(self.backup_dir)
@@ -94,7 +110,7 @@ class BackupManager:
         Returns:
             Command list to execute.
         """
-        db_config = self.config.get_section('DATABASE')
+        db_config = self._db_config
         
         # Base command
         cmd = ['xtrabackup', '--backup', '--target-dir=' + target_dir]
@@ -132,7 +148,7 @@ class BackupManager:
     
     def _compress_backup(self, backup_path: str) -> str:
         """
-        压缩备份目录为tar.gz格式
+        压缩备份目录为tar.gz格式（compression = zstd 时为tar.zst）
         
         Args:
             backup_path: 备份目录路径
@@ -140,12 +156,19 @@ class BackupManager:
         Returns:
             压缩文件路径
         """
-        tar_path = f"{backup_path}.tar.gz"
+        use_zstd = self.compression == 'zstd' and is_tool_available('zstd') and is_tool_available('tar')
+        if self.compression == 'zstd' and not use_zstd:
+            self.logger.warning("zstd 或 tar 不可用，改用 gzip 压缩")
+        
+        tar_path = f"{backup_path}.tar.zst" if use_zstd else f"{backup_path}.tar.gz"
         self.logger.info(f"压缩备份目录 {backup_path} 到 {tar_path}")
         
         try:
-            with tarfile.open(tar_path, "w:gz") as tar:
-                tar.add(backup_path, arcname=os.path.basename(backup_path))
+            if use_zstd:
+                self._compress_with_zstd(backup_path, tar_path)
+            else:
+                with tarfile.open(tar_path, "w:gz") as tar:
+                    tar.add(backup_path, arcname=os.path.basename(backup_path))
             
             # 删除原备份目录
             shutil.rmtree(backup_path)
@@ -160,18 +183,51 @@ class BackupManager:
             
             return backup_path
     
-    def create_full_backup(self, tables: Optional[List[str]] = None) -> str:
+    def _compress_with_zstd(self, backup_path: str, tar_path: str) -> None:
+        """
+        使用 tar 打包并通过管道交给多线程 zstd 压缩
+        
+        Args:
+            backup_path: 备份目录路径
+            tar_path: 压缩文件路径
+        """
+        tar_cmd = ['tar', '-cf', '-', '-C', os.path.dirname(backup_path), os.path.basename(backup_path)]
+        zstd_cmd = ['zstd', '-q', f'-T{max(1, self.threads)}', '-o', tar_path]
+        
+        # tar的stderr写入临时文件：文件很多时警告（如 file changed as we read it）可能写满管道，
+        # 而管道要到zstd结束后才读取，两端会互相等待
+        with tempfile.TemporaryFile() as tar_err_file, subprocess.Popen(
+            tar_cmd, stdout=subprocess.PIPE, stderr=tar_err_file
+        ) as tar_proc:
+            zstd_proc = subprocess.Popen(zstd_cmd, stdin=tar_proc.stdout, stderr=subprocess.PIPE)
+            tar_proc.stdout.close()
+            _, zstd_err = zstd_proc.communicate()
+            tar_proc.wait()
+            tar_err_file.seek(0)
+            tar_err = tar_err_file.read()
+        
+        if tar_proc.returncode != 0:
+            raise RuntimeError(f"tar 执行失败: {tar_err.decode(errors='replace').strip()}")
+        if zstd_proc.returncode != 0:
+            raise RuntimeError(f"zstd 执行失败: {zstd_err.decode(errors='replace').strip()}")
+    
+    def create_full_backup(self, tables: Optional[List[str]] = None, clean: bool = True) -> str:
         """
         Create a full backup of the MySQL database.
         
         Args:
             tables: Optional list of tables to backup. If None, all tables are backed up.
+            clean: Whether to clean up old backups first (False if the caller already did).
             
         Returns:
             Path to the created backup.
         """
         # 在备份前先执行清理操作
-        self.clean_old_backups()
+        if clean:
+            self.clean_old_backups()
+        
+        # 在改动备份目录之前读取索引，只有此时索引是最新的，备份完成后才能追加
+        index_entries = self.read_backup_index()
         
         backup_path = self._get_backup_path('full')
         
@@ -199,9 +255,11 @@ class BackupManager:
             self._create_metadata_file(backup_path, 'full', tables=tables)
             
             # 在配置开启的情况下将备份压缩为tar.gz
-            if self.config.get('BACKUP', 'archive_after_backup', fallback='false').lower() == 'true':
+            if self.archive_after_backup:
                 backup_path = self._compress_backup(backup_path)
             
+            self._write_index_entry(index_entries, 'full', backup_path)
+            
             self.logger.info(f"Full backup completed successfully at {backup_path}")
             return backup_path
             
@@ -218,7 +276,8 @@ class BackupManager:
     def create_incremental_backup(
         self, 
         base_backup: str,
-        tables: Optional[List[str]] = None
+        tables: Optional[List[str]] = None,
+        clean: bool = True
     ) -> str:
         """
         Create an incremental backup based on a previous backup.
@@ -226,22 +285,27 @@ class BackupManager:
         Args:
             base_backup: Path to the base backup.
             tables: Optional list of tables to backup. If None, all tables are backed up.
+            clean: Whether to clean up old backups first (False if the caller already did).
             
         Returns:
             Path to the created incremental backup.
         """
         # 在备份前先执行清理操作
-        self.clean_old_backups()
+        if clean:
+            self.clean_old_backups()
         
         if not os.path.exists(base_backup):
             self.logger.error(f"Base backup {base_backup} does not exist")
             raise FileNotFoundError(f"Base backup {base_backup} does not exist")
         
         # 如果是压缩文件，需要先解压
-        if base_backup.endswith('.tar.gz'):
+        if base_backup.endswith(ARCHIVE_SUFFIXES):
             uncompressed_path = self._uncompress_backup(base_backup)
             base_backup = uncompressed_path
         
+        # 在改动备份目录之前读取索引，只有此时索引是最新的，备份完成后才能追加
+        index_entries = self.read_backup_index()
+        
         timestamp = datetime.now().strftime(self.backup_format)
         
         # Determine if the base is a full or incremental backup
@@ -282,9 +346,11 @@ class BackupManager:
             self._create_metadata_file(backup_path, 'incremental', base_backup=base_backup, tables=tables)
             
             # 在配置开启的情况下将备份压缩为tar.gz
-            if self.config.get('BACKUP', 'archive_after_backup', fallback='false').lower() == 'true':
+            if self.archive_after_backup:
                 backup_path = self._compress_backup(backup_path)
             
+            self._write_index_entry(index_entries, 'incremental', backup_path)
+            
             self.logger.info(f"Incremental backup completed successfully at {backup_path}")
             return backup_path
             
@@ -300,7 +366,7 @@ class BackupManager:
     
     def _uncompress_backup(self, backup_path: str) -> str:
         """
-        解压缩tar.gz格式的备份
+        解压缩tar.gz/tar.zst格式的备份
         
         Args:
             backup_path: 压缩文件路径
@@ -308,15 +374,21 @@ class BackupManager:
         Returns:
             解压后的目录路径
         """
-        if not backup_path.endswith('.tar.gz'):
+        if not backup_path.endswith(ARCHIVE_SUFFIXES):
             return backup_path
         
-        extract_path = backup_path[:-7]  # 移除 .tar.gz
+        extract_path = strip_archive_suffix(backup_path)
         self.logger.info(f"解压备份 {backup_path} 到 {extract_path}")
         
         try:
-            with tarfile.open(backup_path, "r:gz") as tar:
-                tar.extractall(path=os.path.dirname(extract_path))
+            if backup_path.endswith('.tar.zst'):
+                subprocess.run(
+                    ['tar', '-I', 'zstd -d -T0', '-xf', backup_path, '-C', os.path.dirname(extract_path)],
+                    check=True, capture_output=True, text=True
+                )
+            else:
+                with tarfile.open(backup_path, "r:gz") as tar:
+                    tar.extractall(path=os.path.dirname(extract_path))
             
             self.logger.info(f"备份解压完成: {extract_path}")
             return extract_path
@@ -324,15 +396,22 @@ class BackupManager:
             self.logger.error(f"备份解压失败: {e}")
             raise RuntimeError(f"备份解压失败: {e}")
     
-    def backup_binlog(self) -> str:
+    def backup_binlog(self, clean: bool = True) -> str:
         """
         Backup the binary logs.
         
+        Args:
+            clean: Whether to clean up old backups first (False if the caller already did).
+        
         Returns:
             Path to the backed up binary logs.
         """
         # 在备份前先执行清理操作
-        self.clean_old_backups()
+        if clean:
+            self.clean_old_backups()
+        
+        # 在改动备份目录之前读取索引，只有此时索引是最新的，备份完成后才能追加
+        index_entries = self.read_backup_index()
         
         binlog_config = self.config.get_section('BINLOG')
         binlog_dir = binlog_config.get('binlog_dir', '/var/log/mysql')
@@ -374,9 +453,11 @@ class BackupManager:
             self._create_metadata_file(backup_path, 'binlog')
             
             # 在配置开启的情况下将备份压缩为tar.gz
-            if self.config.get('BACKUP', 'archive_after_backup', fallback='false').lower() == 'true':
+            if self.archive_after_backup:
                 backup_path = self._compress_backup(backup_path)
             
+            self._write_index_entry(index_entries, 'binlog', backup_path)
+            
             self.logger.info(f"Binlog backup completed successfully at {backup_path}")
             return backup_path
             
@@ -451,6 +532,206 @@ class BackupManager:
             self.logger.warning(f"Could not get XtraBackup version: {e}")
             return "unknown"
     
+    def _get_index_path(self) -> str:
+        """
+        Get the path of the backup metadata index file.
+        
+        Returns:
+            Path to the index file.
+        """
+        return os.path.join(self.backup_dir, INDEX_FILE_NAME)
+    
+    def _write_index_entry(self, entries: Optional[List[Dict]], kind: str, path: str) -> None:
+        """
+        Add a newly created backup to the metadata index.
+        
+        Args:
+            entries: Index entries read before the backup was created, or None
+                if the index was missing or stale then. In that case nothing is
+                written and the next listing rebuilds the index from a full scan.
+            kind: Type of backup ('full', 'incremental', 'binlog').
+            path: Path to the backup.
+        """
+        if entries is None:
+            return
+        
+        try:
+            entry = self._index_entry(kind, path)
+        except OSError as e:
+            self.logger.warning(f"Could not update backup index {self._get_index_path()}: {e}")
+            return
+        
+        self.write_backup_index(entries + [entry])
+    
+    @staticmethod
+    def _index_entry(kind: str, path: str) -> Dict:
+        """
+        Build the metadata index entry of a backup.
+        
+        The size of a full backup leaves out its inc/ directory: incrementals
+        have entries of their own, and the full backup's entry is not updated
+        when one is added.
+        
+        Args:
+            kind: Type of backup ('full', 'incremental', 'binlog').
+            path: Path to the backup directory or archive.
+            
+        Returns:
+            Index entry with 'kind', 'path', 'size' and 'ctime'.
+        """
+        stat = os.stat(path)
+        if not os.path.isdir(path):
+            size = stat.st_size
+        elif kind == 'full':
+            size = get_directory_size(path, exclude=('inc',))
+        elif kind == 'binlog':
+            # Binary log backups are flat
+            size = get_flat_directory_size(path)
+        else:
+            size = get_directory_size(path)
+        return {'kind': kind, 'path': path, 'size': size, 'ctime': stat.st_ctime}
+    
+    def rebuild_backup_index(self) -> List[Dict]:
+        """
+        Scan the backup directory and rewrite the metadata index from scratch.
+        
+        Backups removed while scanning are skipped.
+        
+        Returns:
+            The new index entries.
+        """
+        entries = []
+        
+        for kind in ('full', 'binlog'):
+            for name, path in self._find_backups(kind):
+                try:
+                    entries.append(self._index_entry(kind, path))
+                except OSError:
+                    continue
+                
+                # 检查增量备份（包括已压缩的）
+                inc_dir = os.path.join(path, 'inc')
+                if kind != 'full' or not os.path.isdir(inc_dir):
+                    continue
+                try:
+                    inc_items = os.listdir(inc_dir)
+                except OSError:
+                    continue
+                for inc_item in inc_items:
+                    inc_path = os.path.join(inc_dir, inc_item)
+                    if inc_item.startswith('inc_') and (os.path.isdir(inc_path) or inc_item.endswith(ARCHIVE_SUFFIXES)):
+                        try:
+                            entries.append(self._index_entry('incremental', inc_path))
+                        except OSError:
+                            continue
+        
+        self.write_backup_index(entries)
+        return entries
+    
+    def _remove_index_entries(self, entries: Optional[List[Dict]], paths: Set[str]) -> None:
+        """
+        Remove deleted backups from the metadata index.
+        
+        Args:
+            entries: Index entries read before the backups were deleted, or None
+                if the index was missing or stale then.
+            paths: Paths of the deleted backups.
+        """
+        if entries is None:
+            return
+        
+        self.write_backup_index([
+            entry for entry in entries
+            if entry['path'] not in paths and os.path.dirname(os.path.dirname(entry['path'])) not in paths
+        ])
+    
+    def _index_generation(self) -> str:
+        """
+        Fingerprint the directories backups live in.
+        
+        Covers the entry names of the backup directory and the modification
+        times of the dated year/month/day directories below it and of the inc/
+        directory of every full backup, so creating or deleting any backup
+        changes the result. The backup directory's own modification time is
+        left out because writing the index changes it. Backup contents are
+        not walked.
+        
+        Returns:
+            Hex digest of the directory state.
+        """
+        digest = hashlib.sha1()
+        pending = [self.backup_dir]
+        
+        while pending:
+            path = pending.pop()
+            try:
+                with os.scandir(path) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+                if path != self.backup_dir:
+                    digest.update(f"{path}:{os.stat(path).st_mtime_ns}\n".encode())
+            except OSError:
+                # A full backup without incrementals has no inc/ directory
+                continue
+            
+            for entry in entries:
+                if path == self.backup_dir:
+                    if entry.name.startswith(INDEX_FILE_NAME):
+                        continue
+                    digest.update(f"{entry.name}\n".encode())
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if entry.name.isdigit():
+                    pending.append(entry.path)
+                elif entry.name.startswith('full_'):
+                    pending.append(os.path.join(entry.path, 'inc'))
+        
+        return digest.hexdigest()
+    
+    def read_backup_index(self, check_stale: bool = True) -> Optional[List[Dict]]:
+        """
+        Read the backup metadata index.
+        
+        The first line of the index records the directory generation it was
+        written for (see _index_generation).
+        
+        Args:
+            check_stale: Treat the index as stale when a backup was created or
+                deleted after the index was last written.
+            
+        Returns:
+            List of index entries, or None if the index is missing, stale or unreadable.
+        """
+        index_path = self._get_index_path()
+        
+        try:
+            with open(index_path) as f:
+                header = json.loads(f.readline())
+                if check_stale and header.get('generation') != self._index_generation():
+                    return None
+                
+                return [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError, AttributeError):
+            return None
+    
+    def write_backup_index(self, entries: List[Dict]) -> None:
+        """
+        Replace the backup metadata index with the given entries.
+        
+        Args:
+            entries: Index entries, each with 'kind', 'path', 'size' and 'ctime'.
+        """
+        index_path = self._get_index_path()
+        tmp_path = f"{index_path}.tmp"
+        
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(json.dumps({'generation': self._index_generation()}) + '\n')
+                for entry in entries:
+                    f.write(json.dumps(entry) + '\n')
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            self.logger.warning(f"Could not write backup index {index_path}: {e}")
+    
     def find_latest_full_backup(self) -> Optional[str]:
         """
         Find the latest full backup.
@@ -483,9 +764,9 @@ class BackupManager:
         
         # 递归遍历备份目录
         for root, dirs, files in os.walk(self.backup_dir):
-            # 检查tar.gz文件
+            # 检查tar.gz/tar.zst文件
             for file in files:
-                if file.endswith('.tar.gz'):
+                if file.endswith(ARCHIVE_SUFFIXES):
                     # 提取备份类型
                     if backup_type is not None and not file.startswith(f"{backup_type}_"):
                         continue
@@ -493,13 +774,15 @@ class BackupManager:
             
             # 检查目录
             for dir_name in dirs:
-                if backup_type is not None and not dir_name.startswith(f"{backup_type}_"):
+                head, sep, _ = dir_name.partition('_')
+                if not sep or head not in _BACKUP_PREFIXES:
+                    continue
+                if backup_type is not None and head != backup_type:
                     continue
                 
                 # 找到匹配的备份目录
-                if dir_name.startswith(('full_', 'incremental_', 'binlog_')):
-                    full_path = os.path.join(root, dir_name)
-                    backups.append((dir_name, full_path))
+                full_path = os.path.join(root, dir_name)
+                backups.append((dir_name, full_path))
         
         return backups
     
@@ -532,7 +815,7 @@ class BackupManager:
             if backup_time <= target_time:
                 suitable_full = path
                 # 如果是压缩文件，解压它
-                if path.endswith('.tar.gz'):
+                if path.endswith(ARCHIVE_SUFFIXES):
                     suitable_full = self._uncompress_backup(path)
                 break
         
@@ -566,18 +849,31 @@ class BackupManager:
             # 如果备份时间在start_time和end_time之间，就包含它
             if start_time <= backup_time <= target_time:
                 # 如果是压缩文件，解压它
-                if path.endswith('.tar.gz'):
+                if path.endswith(ARCHIVE_SUFFIXES):
                     path = self._uncompress_backup(path)
                 suitable_binlogs.append(path)
             # 如果备份时间在全量备份之前但在start_time之后，也包含它
             elif full_backup_time <= backup_time <= start_time:
                 # 如果是压缩文件，解压它
-                if path.endswith('.tar.gz'):
+                if path.endswith(ARCHIVE_SUFFIXES):
                     path = self._uncompress_backup(path)
                 suitable_binlogs.append(path)
         
         return suitable_full, suitable_incrementals, suitable_binlogs
     
+    @staticmethod
+    def _remove_backup(path: str) -> None:
+        """
+        删除一个备份（目录或压缩文件）
+        
+        Args:
+            path: 备份路径
+        """
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    
     def clean_old_backups(self, dry_run: bool = False) -> None:
         """
         清理过期的备份
@@ -585,35 +881,49 @@ class BackupManager:
         Args:
             dry_run: 如果为True，只显示将要删除的备份但不实际删除
         """
-        cutoff_time = datetime.now() - timedelta(days=self.retention_days)
+        cutoff_time = time.time() - self.retention_days * 86400
         deleted_count = 0
+        deleted_paths = set()
         
-        self.logger.info(f"Cleaning up backups older than {cutoff_time}")
+        self.logger.info(f"Cleaning up backups older than {datetime.fromtimestamp(cutoff_time)}")
         
         if dry_run:
             self.logger.info("DRY RUN: Backups will not be actually deleted")
         
+        # 在删除之前读取索引，只有此时索引是最新的，删除后才能据此更新
+        index_entries = self.read_backup_index()
+        
         # 查找所有备份
         all_backups = []
         all_backups.extend(self._find_backups('full'))
         all_backups.extend(self._find_backups('binlog'))
         
-        # 按创建时间排序（最旧的在前）
-        all_backups.sort(key=lambda x: os.path.getctime(x[1]))
-        
+        # 每个备份只读取一次创建时间
+        to_delete = []
         for name, path in all_backups:
-            backup_time = datetime.fromtimestamp(os.path.getctime(path))
-            
-            if backup_time < cutoff_time:
-                self.logger.info(f"{'Would delete' if dry_run else 'Deleting'} old backup: {path}")
-                if not dry_run:
-                    try:
-                        if os.path.isdir(path):
-                            shutil.rmtree(path)
-                        else:
-                            os.remove(path)
-                        deleted_count += 1
-                    except Exception as e:
-                        self.logger.error(f"Failed to delete backup {path}: {e}")
+            ctime = os.path.getctime(path)
+            if ctime < cutoff_time:
+                to_delete.append((ctime, path))
+        
+        # 删除顺序无关紧要，只在试运行时按创建时间排序（最旧的在前）便于查看
+        if dry_run:
+            to_delete.sort(key=lambda x: x[0])
+        
+        for ctime, path in to_delete:
+            self.logger.info(f"{'Would delete' if dry_run else 'Deleting'} old backup: {path}")
+        
+        # 各备份互不相关，并行删除
+        if not dry_run and to_delete:
+            paths = [path for _, path in to_delete]
+            errors = run_parallel(self._remove_backup, paths, min(8, len(paths)))
+            for path, error in zip(paths, errors):
+                if error is not None:
+                    self.logger.error(f"Failed to delete backup {path}: {error}")
+                else:
+                    deleted_count += 1
+                    deleted_paths.add(path)
+        
+        if deleted_paths:
+            self._remove_index_entries(index_entries, deleted_paths)
         
         self.logger.info(f"Cleanup completed. {'Would have deleted' if dry_run else 'Deleted'} {deleted_count} old backups.")
@@ -10,13 +10,14 @@ from datetime import datetime
 from typing import List, Optional, Tuple
 
 from python_sql_backup.config.config_manager import ConfigManager
-from python_sql_backup.backup.backup_manager import BackupManager
-from python_sql_backup.recovery.recovery_manager import RecoveryManager
 from python_sql_backup.cli.interactive import InteractiveAssistant
 from python_sql_backup.utils.common import (
     ensure_dir, get_directory_size, format_size, is_tool_available, parse_table_filter
 )
 
+# BackupManager and RecoveryManager are imported by the commands that use them,
+# so --help and the other commands do not pay for loading them
+
 
 # Create a ConfigManager instance
 config_manager = None
@@ -128,6 +129,7 @@ def backup_full(tables: Optional[str] = None, no_clean: bool = False) -> None:
     table_list = parse_table_filter(tables) if tables else None
     
     try:
+        from python_sql_backup.backup.backup_manager import BackupManager
         backup_manager = BackupManager(config_manager)
         
         # 如果需要清理旧备份
@@ -141,8 +143,7 @@ def backup_full(tables: Optional[str] = None, no_clean: bool = False) -> None:
         click.echo(f"  {backup_path}")
         click.echo(f"  Size: {format_size(get_directory_size(backup_path))}")
     except Exception as e:
-        click.echo(click.style(f"Error: {e}", fg='red'))
-        sys.exit(1)
+        raise click.ClickException(str(e))
 
 
 @backup.command('incremental')
@@ -167,6 +168,7 @@ def backup_incremental(base: str, tables: Optional[str] = None, no_clean: bool =
     table_list = parse_table_filter(tables) if tables else None
     
     try:
+        from python_sql_backup.backup.backup_manager import BackupManager
         backup_manager = BackupManager(config_manager)
         
         # 如果需要清理旧备份
@@ -180,8 +182,7 @@ def backup_incremental(base: str, tables: Optional[str] = None, no_clean: bool =
         click.echo(f"  {backup_path}")
         click.echo(f"  Size: {format_size(get_directory_size(backup_path))}")
     except Exception as e:
-        click.echo(click.style(f"Error: {e}", fg='red'))
-        sys.exit(1)
+        raise click.ClickException(str(e))
 
 
 @backup.command('binlog')
@@ -195,6 +196,7 @@ def backup_binlog(no_clean: bool = False) -> None:
     Backup binary logs.
     """
     try:
+        from python_sql_backup.backup.backup_manager import BackupManager
         backup_manager = BackupManager(config_manager)
         
         # 如果需要清理旧备份
@@ -208,8 +210,14 @@ def backup_binlog(no_clean: bool = False) -> None:
         click.echo(f"  {backup_path}")
         click.echo(f"  Size: {format_size(get_directory_size(backup_path))}")
     except Exception as e:
-        click.echo(click.style(f"Error: {e}", fg='red'))
-        sys.exit(1)
+        raise click.ClickException(str(e))
+
+
+# 备份类型与显示名称的对应关系
+BACKUP_TYPE_LABELS = {
+    'full': '全量备份',
+    'binlog': '二进制日志备份',
+}
 
 
 @backup.command('list')
@@ -217,6 +225,7 @@ def list_backups() -> None:
     """
     List all available backups.
     """
+    from python_sql_backup.backup.backup_manager import BackupManager
     backup_manager = BackupManager(config_manager)
     backup_dir = backup_manager.backup_dir
     
@@ -224,60 +233,57 @@ def list_backups() -> None:
         click.echo(f"No backups found in {backup_dir}")
         return
     
-    # 使用新的查找备份方法
-    full_backups = backup_manager._find_backups('full')
-    binlog_backups = backup_manager._find_backups('binlog')
+    # 优先读取索引文件，索引缺失或过期时才遍历备份目录并重建索引
+    entries = backup_manager.read_backup_index()
+    if entries is None:
+        entries = backup_manager.rebuild_backup_index()
     
     all_backups = []
-    all_backups.extend([(name, path, '全量备份') for name, path in full_backups])
-    all_backups.extend([(name, path, '二进制日志备份') for name, path in binlog_backups])
+    incrementals = {}
+    for entry in entries:
+        if not os.path.exists(entry['path']):
+            continue
+        if entry['kind'] == 'incremental':
+            # 增量备份位于 <全量备份>/inc/ 下
+            full_path = os.path.dirname(os.path.dirname(entry['path']))
+            incrementals.setdefault(full_path, []).append(entry)
+        elif entry['kind'] in BACKUP_TYPE_LABELS:
+            all_backups.append(entry)
     
     # 按创建时间排序（最新的在前）
-    all_backups.sort(key=lambda x: os.path.getctime(x[1]), reverse=True)
+    all_backups.sort(key=lambda x: x['ctime'], reverse=True)
     
     if not all_backups:
         click.echo(f"No backups found in {backup_dir}")
         return
     
-    # Display backups
-    click.echo(click.style(f"Backups in {backup_dir}:", fg='green'))
-    for name, path, backup_type in all_backups:
-        ctime = os.path.getctime(path)
-        creation_time = datetime.fromtimestamp(ctime).strftime('%Y-%m-%d %H:%M:%S')
-        size = get_directory_size(path) if os.path.isdir(path) else os.path.getsize(path)
+    # Display backups (collected first and written in a single call)
+    lines = [click.style(f"Backups in {backup_dir}:", fg='green')]
+    append = lines.append
+    for entry in all_backups:
+        path = entry['path']
+        creation_time = datetime.fromtimestamp(entry['ctime']).strftime('%Y-%m-%d %H:%M:%S')
         
-        click.echo(f"  {backup_type}: {name}")
-        click.echo(f"    Path: {path}")
-        click.echo(f"    Created: {creation_time}")
-        click.echo(f"    Size: {format_size(size)}")
+        append(f"  {BACKUP_TYPE_LABELS[entry['kind']]}: {os.path.basename(path)}")
+        append(f"    Path: {path}")
+        append(f"    Created: {creation_time}")
+        append(f"    Size: {format_size(entry['size'])}")
         
-        # 检查增量备份
-        if backup_type == '全量备份' and os.path.isdir(path):
-            inc_dir = os.path.join(path, 'inc')
-            if os.path.exists(inc_dir) and os.path.isdir(inc_dir):
-                incremental_backups = []
-                
-                for inc_item in os.listdir(inc_dir):
-                    if inc_item.startswith('inc_'):
-                        inc_path = os.path.join(inc_dir, inc_item)
-                        if os.path.isdir(inc_path):
-                            inc_ctime = os.path.getctime(inc_path)
-                            inc_creation_time = datetime.fromtimestamp(inc_ctime).strftime('%Y-%m-%d %H:%M:%S')
-                            inc_size = get_directory_size(inc_path)
-                            incremental_backups.append((inc_item, inc_path, inc_creation_time, inc_size))
-                
-                # Sort incrementals by creation time
-                incremental_backups.sort(key=lambda x: x[2])
-                
-                if incremental_backups:
-                    click.echo(f"    增量备份:")
-                    for inc_name, inc_path, inc_time, inc_size in incremental_backups:
-                        click.echo(f"      {inc_name}")
-                        click.echo(f"        Path: {inc_path}")
-                        click.echo(f"        Created: {inc_time}")
-                        click.echo(f"        Size: {format_size(inc_size)}")
+        # Sort incrementals by creation time
+        incremental_backups = sorted(incrementals.get(path, []), key=lambda x: x['ctime'])
         
-        click.echo()  # Add an empty line between backups
+        if incremental_backups:
+            append(f"    增量备份:")
+            for inc in incremental_backups:
+                inc_time = datetime.fromtimestamp(inc['ctime']).strftime('%Y-%m-%d %H:%M:%S')
+                append(f"      {os.path.basename(inc['path'])}")
+                append(f"        Path: {inc['path']}")
+                append(f"        Created: {inc_time}")
+                append(f"        Size: {format_size(inc['size'])}")
+        
+        append("")  # Add an empty line between backups
+    
+    click.echo('\n'.join(lines))
 
 
 @backup.command('clean')
@@ -294,6 +300,7 @@ def clean_backups(days: Optional[int] = None, dry_run: bool = False) -> None:
     """
     Clean up old backups based on retention policy.
     """
+    from python_sql_backup.backup.backup_manager import BackupManager
     backup_manager = BackupManager(config_manager)
     
     # Use configured retention period if not specified
@@ -348,13 +355,13 @@ def restore_full(
     backup_existing = not no_backup_existing
     
     try:
+        from python_sql_backup.recovery.recovery_manager import RecoveryManager
         recovery_manager = RecoveryManager(config_manager)
         recovery_manager.restore_full_backup(backup_path, backup_existing, table_list)
         
         click.echo(click.style(f"Full backup restored successfully from {backup_path}", fg='green'))
     except Exception as e:
-        click.echo(click.style(f"Error: {e}", fg='red'))
-        sys.exit(1)
+        raise click.ClickException(str(e))
 
 
 @restore.command('incremental')
@@ -393,6 +400,7 @@ def restore_incremental(
     backup_existing = not no_backup_existing
     
     try:
+        from python_sql_backup.recovery.recovery_manager import RecoveryManager
         recovery_manager = RecoveryManager(config_manager)
         recovery_manager.restore_incremental_backup(full, list(incremental), backup_existing, table_list)
         
@@ -401,8 +409,7 @@ def restore_incremental(
         for i, inc in enumerate(incremental):
             click.echo(f"Incremental backup {i+1}: {inc}")
     except Exception as e:
-        click.echo(click.style(f"Error: {e}", fg='red'))
-        sys.exit(1)
+        raise click.ClickException(str(e))
 
 
 @restore.command('point-in-time')
@@ -437,8 +444,8 @@ def restore_point_in_time(
     """
     try:
         # Parse the timestamps
-        start_datetime = datetime.strptime(start_time, '%Y-%m-%d %H:%M:%S')
-        end_datetime = datetime.strptime(end_time, '%Y-%m-%d %H:%M:%S') if end_time else None
+        start_datetime = datetime.fromisoformat(start_time)
+        end_datetime = datetime.fromisoformat(end_time) if end_time else None
         
         if end_datetime and end_datetime <= start_datetime:
             click.echo(click.style(f"Error: End time must be later than start time", fg='red'))
@@ -447,6 +454,7 @@ def restore_point_in_time(
         table_list = parse_table_filter(tables) if tables else None
         backup_existing = not no_backup_existing
         
+        from python_sql_backup.recovery.recovery_manager import RecoveryManager
         recovery_manager = RecoveryManager(config_manager)
         recovery_manager.restore_to_point_in_time(start_datetime, end_datetime, backup_existing, table_list)
         
@@ -458,8 +466,7 @@ def restore_point_in_time(
         click.echo(click.style(f"Error: Invalid timestamp format. Use YYYY-MM-DD HH:MM:SS", fg='red'))
         sys.exit(1)
     except Exception as e:
-        click.echo(click.style(f"Error: {e}", fg='red'))
-        sys.exit(1)
+        raise click.ClickException(str(e))
 
 
 @restore.command('binlog')
@@ -494,8 +501,8 @@ def restore_binlog(
     
     try:
         # Parse the timestamps
-        start_datetime = datetime.strptime(start_time, '%Y-%m-%d %H:%M:%S') if start_time else None
-        end_datetime = datetime.strptime(end_time, '%Y-%m-%d %H:%M:%S') if end_time else None
+        start_datetime = datetime.fromisoformat(start_time) if start_time else None
+        end_datetime = datetime.fromisoformat(end_time) if end_time else None
         
         if start_datetime and end_datetime and end_datetime <= start_datetime:
             click.echo(click.style(f"Error: End time must be later than start time", fg='red'))
@@ -503,6 +510,7 @@ def restore_binlog(
         
         table_list = parse_table_filter(tables) if tables else None
         
+        from python_sql_backup.recovery.recovery_manager import RecoveryManager
         recovery_manager = RecoveryManager(config_manager)
         recovery_manager.apply_binlog(list(binlog_paths), start_datetime, end_datetime, table_list)
         
@@ -511,8 +519,7 @@ def restore_binlog(
         click.echo(click.style(f"Error: Invalid timestamp format. Use YYYY-MM-DD HH:MM:SS", fg='red'))
         sys.exit(1)
     except Exception as e:
-        click.echo(click.style(f"Error: {e}", fg='red'))
-        sys.exit(1)
+        raise click.ClickException(str(e))
 
 
 if __name__ == '__main__':
@@ -3,15 +3,121 @@
 """
 import os
 import sys
+import json
 import click
+import logging
 import datetime
-from typing import List, Optional, Dict, Any, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple
 
 from python_sql_backup.config.config_manager import ConfigManager
-from python_sql_backup.backup.backup_manager import BackupManager
-from python_sql_backup.recovery.recovery_manager import RecoveryManager
 from python_sql_backup.utils.common import format_size, get_directory_size
 
+if TYPE_CHECKING:
+    from python_sql_backup.backup.backup_manager import BackupManager
+    from python_sql_backup.recovery.recovery_manager import RecoveryManager
+
+
+# 备份目录名称前缀与备份类型的对应关系
+_PREFIX_TO_TYPE = {
+    'full_': '全量备份',
+    'binlog_': '二进制日志备份',
+    'pre_restore_backup_': '恢复前备份',
+}
+
+# 预先生成的固定样式文本，避免每次调用都重新构造ANSI转义序列
+_HDR_BACKUP_ASSISTANT = click.style("=== MySQL 备份助手 ===", fg='green', bold=True)
+_HDR_RECOVERY_ASSISTANT = click.style("=== MySQL 恢复助手 ===", fg='green', bold=True)
+_MSG_INVALID_CHOICE = click.style("无效的选择", fg='red')
+_WARN_OVERWRITE = click.style("警告: 此操作将覆盖现有数据。确定要继续吗？", fg='yellow', bold=True)
+
+# 备份目录大小缓存文件（放在用户缓存目录中，避免改动备份目录本身的时间戳）
+SIZE_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'python_sql_backup', 'size_cache.json')
+
+
+def _size_cache_key(path: str, st: os.stat_result) -> str:
+    """
+    生成目录大小缓存的键
+    
+    Args:
+        path: 备份目录路径
+        st: 备份目录的stat结果
+        
+    Returns:
+        由inode和修改时间组成的缓存键
+    """
+    key = f"{st.st_ino}-{st.st_mtime_ns}"
+    
+    # 增量备份写入 <全量备份>/inc/ 下，不会改变全量备份目录本身的修改时间
+    try:
+        key += f"-{os.stat(os.path.join(path, 'inc')).st_mtime_ns}"
+    except FileNotFoundError:
+        pass
+    
+    return key
+
+
+def _load_size_cache() -> Dict[str, Dict[str, Any]]:
+    """
+    读取目录大小缓存
+    
+    Returns:
+        缓存内容，读取失败时返回空字典
+    """
+    try:
+        with open(SIZE_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_size_cache(cache: Dict[str, Dict[str, Any]]) -> None:
+    """
+    原子地写入目录大小缓存
+    
+    Args:
+        cache: 缓存内容
+    """
+    tmp_path = f"{SIZE_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(SIZE_CACHE_FILE), exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, SIZE_CACHE_FILE)
+    except OSError:
+        # 缓存只是优化，写入失败不影响功能
+        pass
+
+
+def _stat_backup(path: str, cache: Dict[str, Dict[str, Any]]) -> Optional[Tuple[float, int]]:
+    """
+    获取备份目录的创建时间和大小
+    
+    Args:
+        path: 备份目录路径
+        cache: 目录大小缓存，命中时跳过目录遍历，未命中时会写入新值
+        
+    Returns:
+        (创建时间戳, 目录大小)，目录在列出后已被删除或无法访问时返回None
+    """
+    try:
+        st = os.stat(path)
+        key = _size_cache_key(path, st)
+    except OSError:
+        return None
+    
+    cached = cache.get(path)
+    if cached and cached.get('key') == key:
+        return st.st_ctime, cached['size']
+    
+    # get_directory_size会跳过遍历过程中消失或无法读取的文件和目录
+    size = get_directory_size(path)
+    
+    cache[path] = {'key': key, 'size': size}
+    return st.st_ctime, size
+
 
 class InteractiveAssistant:
     """交互式助手类，引导用户完成备份和恢复操作"""
@@ -24,22 +130,34 @@ class InteractiveAssistant:
             config_manager: 配置管理器实例
         """
         self.config = config_manager
-        self.backup_manager = BackupManager(config_manager)
-        self.recovery_manager = RecoveryManager(config_manager)
+    
+    @cached_property
+    def backup_manager(self) -> 'BackupManager':
+        """备份管理器，首次使用时才创建"""
+        from python_sql_backup.backup.backup_manager import BackupManager
+        return BackupManager(self.config)
+    
+    @cached_property
+    def recovery_manager(self) -> 'RecoveryManager':
+        """恢复管理器，首次使用时才创建"""
+        from python_sql_backup.recovery.recovery_manager import RecoveryManager
+        return RecoveryManager(self.config)
     
     def start_backup_assistant(self) -> None:
         """启动备份操作助手"""
         click.clear()
-        click.echo(click.style("=== MySQL 备份助手 ===", fg='green', bold=True))
+        click.echo(_HDR_BACKUP_ASSISTANT)
         click.echo("此助手将引导您完成MySQL数据库的备份操作。\n")
         
-        # 自动清理过期备份
-        click.echo("正在检查和清理过期备份...")
-        try:
-            self.backup_manager.clean_old_backups(dry_run=False)
-            click.echo(click.style("✓ 过期备份清理完成", fg='green'))
-        except Exception as e:
-            click.echo(click.style(f"! 清理过期备份时出错: {e}", fg='yellow'))
+        # 在后台自动清理过期备份，用户无需等待即可选择备份类型
+        click.echo("正在后台检查和清理过期备份...")
+        clean_errors = []
+        clean_thread = threading.Thread(
+            target=self._safe_clean,
+            args=(self.backup_manager, clean_errors),
+            daemon=True
+        )
+        clean_thread.start()
         
         # 选择备份类型
         backup_type = click.prompt(
@@ -48,6 +166,13 @@ class InteractiveAssistant:
             default='full'
         )
         
+        # 等待清理结束再报告结果，下面的备份不再重复清理
+        clean_thread.join()
+        if clean_errors:
+            click.echo(click.style(f"! 清理过期备份时出错: {clean_errors[0]}", fg='yellow'))
+        else:
+            click.echo(click.style("✓ 过期备份清理完成", fg='green'))
+        
         if backup_type == 'full':
             self._handle_full_backup()
         elif backup_type == 'incremental':
@@ -55,32 +180,56 @@ class InteractiveAssistant:
         elif backup_type == 'binlog':
             self._handle_binlog_backup()
     
+    @staticmethod
+    def _safe_clean(backup_manager: 'BackupManager', errors: List[Exception]) -> None:
+        """
+        清理过期备份，异常记录到errors中而不是抛出（在后台线程中运行）
+        
+        清理期间用户正在输入，备份管理器的日志只写入日志文件，不输出到控制台，
+        结果在提示结束后统一报告。
+        
+        Args:
+            backup_manager: 备份管理器实例
+            errors: 用于收集异常的列表
+        """
+        logger_name = backup_manager.logger.name
+        
+        def not_backup_manager(record: logging.LogRecord) -> bool:
+            return record.name != logger_name
+        
+        # 收集日志记录会经过的所有控制台处理器（包括根日志器上的）
+        console_handlers = []
+        logger = backup_manager.logger
+        while logger:
+            console_handlers.extend(
+                handler for handler in logger.handlers
+                if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler)
+            )
+            if not logger.propagate:
+                break
+            logger = logger.parent
+        
+        for handler in console_handlers:
+            handler.addFilter(not_backup_manager)
+        
+        try:
+            backup_manager.clean_old_backups(dry_run=False)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            for handler in console_handlers:
+                handler.removeFilter(not_backup_manager)
+    
     def _handle_full_backup(self) -> None:
         """处理全量备份操作"""
         click.echo("\n=== 全量备份 ===")
         
         # 询问是否需要指定数据库和表
-        use_specific_tables = click.confirm("是否需要只备份特定数据库的特定表？", default=False)
-        
-        tables = None
-        if use_specific_tables:
-            # 首先选择数据库
-            database = click.prompt("请输入要备份的数据库名称")
-            
-            # 然后选择表
-            tables_input = click.prompt(
-                "请输入要备份的表名(多个表用逗号分隔，输入'*'表示备份该数据库的所有表)",
-                default='*'
-            )
-            
-            if tables_input == '*':
-                tables = [f"{database}.*"]
-            else:
-                tables = [f"{database}.{table.strip()}" for table in tables_input.split(',')]
+        tables = self._prompt_tables()
         
         try:
             click.echo("开始执行全量备份...")
-            backup_path = self.backup_manager.create_full_backup(tables=tables)
+            backup_path = self.backup_manager.create_full_backup(tables=tables, clean=False)
             
             click.echo(click.style("\n✓ 全量备份创建成功！", fg='green', bold=True))
             click.echo(f"  备份路径: {backup_path}")
@@ -110,33 +259,17 @@ class InteractiveAssistant:
         )
         
         if selected_index < 1 or selected_index > len(available_backups):
-            click.echo(click.style("无效的选择", fg='red'))
+            click.echo(_MSG_INVALID_CHOICE)
             return
         
         base_backup = available_backups[selected_index - 1][2]
         
         # 询问是否需要指定数据库和表
-        use_specific_tables = click.confirm("是否需要只备份特定数据库的特定表？", default=False)
-        
-        tables = None
-        if use_specific_tables:
-            # 首先选择数据库
-            database = click.prompt("请输入要备份的数据库名称")
-            
-            # 然后选择表
-            tables_input = click.prompt(
-                "请输入要备份的表名(多个表用逗号分隔，输入'*'表示备份该数据库的所有表)",
-                default='*'
-            )
-            
-            if tables_input == '*':
-                tables = [f"{database}.*"]
-            else:
-                tables = [f"{database}.{table.strip()}" for table in tables_input.split(',')]
+        tables = self._prompt_tables()
         
         try:
             click.echo("开始执行增量备份...")
-            backup_path = self.backup_manager.create_incremental_backup(base_backup, tables=tables)
+            backup_path = self.backup_manager.create_incremental_backup(base_backup, tables=tables, clean=False)
             
             click.echo(click.style("\n✓ 增量备份创建成功！", fg='green', bold=True))
             click.echo(f"  备份路径: {backup_path}")
@@ -150,7 +283,7 @@ class InteractiveAssistant:
         
         try:
             click.echo("开始执行二进制日志备份...")
-            backup_path = self.backup_manager.backup_binlog()
+            backup_path = self.backup_manager.backup_binlog(clean=False)
             
             click.echo(click.style("\n✓ 二进制日志备份创建成功！", fg='green', bold=True))
             click.echo(f"  备份路径: {backup_path}")
@@ -161,7 +294,7 @@ class InteractiveAssistant:
     def start_recovery_assistant(self) -> None:
         """启动恢复操作助手"""
         click.clear()
-        click.echo(click.style("=== MySQL 恢复助手 ===", fg='green', bold=True))
+        click.echo(_HDR_RECOVERY_ASSISTANT)
         click.echo("此助手将引导您完成MySQL数据库的恢复操作。\n")
         
         # 选择恢复类型
@@ -202,7 +335,7 @@ class InteractiveAssistant:
         )
         
         if selected_index < 1 or selected_index > len(available_backups):
-            click.echo(click.style("无效的选择", fg='red'))
+            click.echo(_MSG_INVALID_CHOICE)
             return
         
         backup_path = available_backups[selected_index - 1][2]
@@ -211,27 +344,11 @@ class InteractiveAssistant:
         backup_existing = click.confirm("是否在恢复前备份现有数据？", default=True)
         
         # 询问是否需要指定数据库和表
-        use_specific_tables = click.confirm("是否需要只恢复特定数据库的特定表？", default=False)
-        
-        tables = None
-        if use_specific_tables:
-            # 首先选择数据库
-            database = click.prompt("请输入要恢复的数据库名称")
-            
-            # 然后选择表
-            tables_input = click.prompt(
-                "请输入要恢复的表名(多个表用逗号分隔，输入'*'表示恢复该数据库的所有表)",
-                default='*'
-            )
-            
-            if tables_input == '*':
-                tables = [f"{database}.*"]
-            else:
-                tables = [f"{database}.{table.strip()}" for table in tables_input.split(',')]
+        tables = self._prompt_tables('恢复')
         
         # 最终确认
         if not click.confirm(
-            click.style("警告: 此操作将覆盖现有数据。确定要继续吗？", fg='yellow', bold=True),
+            _WARN_OVERWRITE,
             default=False
         ):
             click.echo("操作已取消")
@@ -250,7 +367,7 @@ class InteractiveAssistant:
         click.echo("\n=== 增量恢复 ===")
         
         # 获取可用的全量备份列表
-        full_backups = self._get_available_backups(full_only=True)
+        full_backups = self._get_available_backups(full_only=True, include_incrementals=True)
         
         if not full_backups:
             click.echo(click.style("没有找到可用的全量备份", fg='yellow'))
@@ -268,13 +385,13 @@ class InteractiveAssistant:
         )
         
         if selected_index < 1 or selected_index > len(full_backups):
-            click.echo(click.style("无效的选择", fg='red'))
+            click.echo(_MSG_INVALID_CHOICE)
             return
         
         full_backup_path = full_backups[selected_index - 1][2]
         
-        # 获取可用的增量备份列表
-        incremental_backups = self._get_incremental_backups(full_backup_path)
+        # 可用的增量备份列表已在获取全量备份时一并取得
+        incremental_backups = full_backups[selected_index - 1][5]
         
         if not incremental_backups:
             click.echo(click.style(f"没有找到与所选全量备份相关的增量备份", fg='yellow'))
@@ -282,7 +399,8 @@ class InteractiveAssistant:
         
         # 显示可用的增量备份
         click.echo("\n可用的增量备份:")
-        for i, (backup_time, path) in enumerate(incremental_backups, 1):
+        for i, (ctime, path) in enumerate(incremental_backups, 1):
+            backup_time = datetime.datetime.fromtimestamp(ctime).isoformat(' ', 'seconds')
             click.echo(f"  {i}. {backup_time} - {path}")
         
         # 选择要应用的增量备份
@@ -291,41 +409,22 @@ class InteractiveAssistant:
             default="1"
         )
         
+        indices = self._parse_indices(selected_indices, len(incremental_backups))
+        if indices is None:
+            return
+        
         try:
-            selected_indices = [int(idx.strip()) for idx in selected_indices.split(',')]
-            incremental_paths = []
-            
-            for idx in selected_indices:
-                if idx < 1 or idx > len(incremental_backups):
-                    click.echo(click.style(f"无效的选择: {idx}", fg='red'))
-                    return
-                incremental_paths.append(incremental_backups[idx - 1][1])
+            incremental_paths = [incremental_backups[idx - 1][1] for idx in indices]
             
             # 是否备份现有数据
             backup_existing = click.confirm("是否在恢复前备份现有数据？", default=True)
             
             # 询问是否需要指定数据库和表
-            use_specific_tables = click.confirm("是否需要只恢复特定数据库的特定表？", default=False)
-            
-            tables = None
-            if use_specific_tables:
-                # 首先选择数据库
-                database = click.prompt("请输入要恢复的数据库名称")
-                
-                # 然后选择表
-                tables_input = click.prompt(
-                    "请输入要恢复的表名(多个表用逗号分隔，输入'*'表示恢复该数据库的所有表)",
-                    default='*'
-                )
-                
-                if tables_input == '*':
-                    tables = [f"{database}.*"]
-                else:
-                    tables = [f"{database}.{table.strip()}" for table in tables_input.split(',')]
+            tables = self._prompt_tables('恢复')
             
             # 最终确认
             if not click.confirm(
-                click.style("警告: 此操作将覆盖现有数据。确定要继续吗？", fg='yellow', bold=True),
+                _WARN_OVERWRITE,
                 default=False
             ):
                 click.echo("操作已取消")
@@ -341,9 +440,6 @@ class InteractiveAssistant:
             )
             
             click.echo(click.style("\n✓ 增量恢复完成！", fg='green', bold=True))
-        except ValueError as e:
-            click.echo(click.style(f"请输入有效的编号列表: {e}", fg='red'))
-            return
         except Exception as e:
             click.echo(click.style(f"\n✗ 恢复失败: {e}", fg='red', bold=True))
     
@@ -363,8 +459,8 @@ class InteractiveAssistant:
         )
         
         try:
-            start_time = datetime.datetime.strptime(start_time_str, "%Y-%m-%d %H:%M:%S")
-            end_time = datetime.datetime.strptime(end_time_str, "%Y-%m-%d %H:%M:%S")
+            start_time = datetime.datetime.fromisoformat(start_time_str)
+            end_time = datetime.datetime.fromisoformat(end_time_str)
             
             if end_time <= start_time:
                 click.echo(click.style("结束时间必须晚于起始时间", fg='red'))
@@ -374,27 +470,11 @@ class InteractiveAssistant:
             backup_existing = click.confirm("是否在恢复前备份现有数据？", default=True)
             
             # 询问是否需要指定数据库和表
-            use_specific_tables = click.confirm("是否需要只恢复特定数据库的特定表？", default=False)
-            
-            tables = None
-            if use_specific_tables:
-                # 首先选择数据库
-                database = click.prompt("请输入要恢复的数据库名称")
-                
-                # 然后选择表
-                tables_input = click.prompt(
-                    "请输入要恢复的表名(多个表用逗号分隔，输入'*'表示恢复该数据库的所有表)",
-                    default='*'
-                )
-                
-                if tables_input == '*':
-                    tables = [f"{database}.*"]
-                else:
-                    tables = [f"{database}.{table.strip()}" for table in tables_input.split(',')]
+            tables = self._prompt_tables('恢复')
             
             # 最终确认
             if not click.confirm(
-                click.style("警告: 此操作将覆盖现有数据。确定要继续吗？", fg='yellow', bold=True),
+                _WARN_OVERWRITE,
                 default=False
             ):
                 click.echo("操作已取消")
@@ -436,15 +516,12 @@ class InteractiveAssistant:
             default="1"
         )
         
+        indices = self._parse_indices(selected_indices, len(binlog_backups))
+        if indices is None:
+            return
+        
         try:
-            selected_indices = [int(idx.strip()) for idx in selected_indices.split(',')]
-            binlog_paths = []
-            
-            for idx in selected_indices:
-                if idx < 1 or idx > len(binlog_backups):
-                    click.echo(click.style(f"无效的选择: {idx}", fg='red'))
-                    return
-                binlog_paths.append(binlog_backups[idx - 1][2])
+            binlog_paths = [binlog_backups[idx - 1][2] for idx in indices]
             
             # 获取时间范围
             use_time_range = click.confirm("是否需要指定时间范围？", default=True)
@@ -462,31 +539,15 @@ class InteractiveAssistant:
                     default=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 )
                 
-                start_time = datetime.datetime.strptime(start_time_str, "%Y-%m-%d %H:%M:%S")
-                end_time = datetime.datetime.strptime(end_time_str, "%Y-%m-%d %H:%M:%S")
+                start_time = datetime.datetime.fromisoformat(start_time_str)
+                end_time = datetime.datetime.fromisoformat(end_time_str)
                 
                 if end_time <= start_time:
                     click.echo(click.style("结束时间必须晚于起始时间", fg='red'))
                     return
             
             # 询问是否需要指定数据库和表
-            use_specific_tables = click.confirm("是否需要只恢复特定数据库的特定表？", default=False)
-            
-            tables = None
-            if use_specific_tables:
-                # 首先选择数据库
-                database = click.prompt("请输入要恢复的数据库名称")
-                
-                # 然后选择表
-                tables_input = click.prompt(
-                    "请输入要恢复的表名(多个表用逗号分隔，输入'*'表示恢复该数据库的所有表)",
-                    default='*'
-                )
-                
-                if tables_input == '*':
-                    tables = [f"{database}.*"]
-                else:
-                    tables = [f"{database}.{table.strip()}" for table in tables_input.split(',')]
+            tables = self._prompt_tables('恢复')
             
             # 最终确认
             if not click.confirm(
@@ -511,54 +572,146 @@ class InteractiveAssistant:
         except Exception as e:
             click.echo(click.style(f"\n✗ 恢复失败: {e}", fg='red', bold=True))
     
-    def _get_available_backups(self, full_only: bool = False, binlog_only: bool = False) -> List[Tuple[str, str, str, str, int]]:
+    def _prompt_tables(self, verb: str = '备份') -> Optional[List[str]]:
+        """
+        询问用户是否只操作特定数据库的特定表
+        
+        Args:
+            verb: 操作名称，用于提示文字（'备份'或'恢复'）
+            
+        Returns:
+            表列表（db.table格式），不指定时返回None
+        """
+        if not click.confirm(f"是否需要只{verb}特定数据库的特定表？", default=False):
+            return None
+        
+        # 首先选择数据库
+        database = click.prompt(f"请输入要{verb}的数据库名称")
+        
+        # 然后选择表
+        tables_input = click.prompt(
+            f"请输入要{verb}的表名(多个表用逗号分隔，输入'*'表示{verb}该数据库的所有表)",
+            default='*'
+        )
+        
+        if tables_input == '*':
+            return [f"{database}.*"]
+        return [f"{database}.{table.strip()}" for table in tables_input.split(',')]
+    
+    def _parse_indices(self, selection: str, upper: int) -> Optional[List[int]]:
+        """
+        解析并校验逗号分隔的编号列表
+        
+        Args:
+            selection: 用户输入的编号列表，如 "1,3"
+            upper: 允许的最大编号
+            
+        Returns:
+            编号列表（从1开始），输入无效时提示错误并返回None
+        """
+        try:
+            indices = [int(idx) for idx in selection.split(',')]
+        except ValueError as e:
+            click.echo(click.style(f"请输入有效的编号列表: {e}", fg='red'))
+            return None
+        
+        invalid = next((idx for idx in indices if not 1 <= idx <= upper), None)
+        if invalid is not None:
+            click.echo(click.style(f"无效的选择: {invalid}", fg='red'))
+            return None
+        
+        return indices
+    
+    def _get_available_backups(
+        self,
+        full_only: bool = False,
+        binlog_only: bool = False,
+        include_incrementals: bool = False
+    ) -> List[Tuple[Any, ...]]:
         """
         获取可用的备份列表
         
         Args:
             full_only: 是否只获取全量备份
             binlog_only: 是否只获取二进制日志备份
+            include_incrementals: 是否同时获取全量备份下的增量备份
             
         Returns:
-            备份列表，每项包含(类型, 名称, 路径, 创建时间, 大小)
+            备份列表，每项包含(类型, 名称, 路径, 创建时间戳, 大小)；
+            include_incrementals为True时追加第六项增量备份列表，格式同_get_incremental_backups
         """
-        backup_dir = self.backup_manager.backup_dir
-        
-        if not os.path.exists(backup_dir):
-            return []
+        # 直接读取配置，仅列出备份时无需创建备份管理器
+        backup_dir = self.config.get('BACKUP', 'backup_dir')
         
-        # 获取所有备份目录
-        backups = []
-        for item in os.listdir(backup_dir):
-            full_path = os.path.join(backup_dir, item)
-            if os.path.isdir(full_path):
-                # 根据过滤条件筛选备份类型
-                if full_only and not item.startswith('full_'):
-                    continue
-                if binlog_only and not item.startswith('binlog_'):
-                    continue
-                
-                if item.startswith(('full_', 'binlog_', 'pre_restore_backup_')):
-                    # 获取备份类型
-                    backup_type = '全量备份' if item.startswith('full_') else \
-                                '二进制日志备份' if item.startswith('binlog_') else \
-                                '恢复前备份'
+        # 获取所有备份目录（先按名称过滤，再用DirEntry缓存的类型信息判断是否为目录）
+        candidates = []
+        listed = set()
+        try:
+            with os.scandir(backup_dir) as it:
+                for entry in it:
+                    item = entry.name
+                    prefix = next((pfx for pfx in _PREFIX_TO_TYPE if item.startswith(pfx)), None)
+                    if not prefix:
+                        continue
+                    listed.add(entry.path)
                     
-                    # 获取创建时间
-                    ctime = os.path.getctime(full_path)
-                    creation_time = datetime.datetime.fromtimestamp(ctime).strftime('%Y-%m-%d %H:%M:%S')
+                    # 根据过滤条件筛选备份类型
+                    if full_only and prefix != 'full_':
+                        continue
+                    if binlog_only and prefix != 'binlog_':
+                        continue
                     
-                    # 获取大小
-                    size = get_directory_size(full_path)
+                    if not entry.is_dir():
+                        continue
                     
-                    backups.append((backup_type, item, full_path, creation_time, size))
+                    candidates.append((_PREFIX_TO_TYPE[prefix], item, entry.path))
+        except FileNotFoundError:
+            return []
+        
+        if not candidates:
+            return []
+        
+        size_cache = _load_size_cache()
+        cached_sizes = dict(size_cache)
+        
+        # 目录遍历以I/O等待为主，使用线程池并发获取各备份的创建时间和大小
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4, len(candidates))) as pool:
+            stats = list(pool.map(
+                lambda full_path: _stat_backup(full_path, size_cache),
+                [full_path for _, _, full_path in candidates]
+            ))
+            
+            # 在同一次遍历中获取增量备份，避免选择后再次扫描
+            if include_incrementals:
+                incrementals = list(pool.map(
+                    lambda candidate: self._get_incremental_backups(candidate[2]) if candidate[0] == '全量备份' else [],
+                    candidates
+                ))
+        
+        backups = []
+        for i, (candidate, stat) in enumerate(zip(candidates, stats)):
+            # 跳过列出后已被删除或无法访问的备份
+            if stat is None:
+                continue
+            backup = candidate + stat
+            if include_incrementals:
+                backup += (incrementals[i],)
+            backups.append(backup)
+        
+        # 删除本备份目录下已不存在的备份的缓存项，避免缓存文件无限增长
+        parent = os.path.dirname(os.path.join(backup_dir, ''))
+        for path in [path for path in size_cache if os.path.dirname(path) == parent and path not in listed]:
+            del size_cache[path]
+        
+        if size_cache != cached_sizes:
+            _save_size_cache(size_cache)
         
         # 按创建时间排序（最新的在前）
         backups.sort(key=lambda x: x[3], reverse=True)
         
         return backups
     
-    def _get_incremental_backups(self, full_backup_path: str) -> List[Tuple[str, str]]:
+    def _get_incremental_backups(self, full_backup_path: str) -> List[Tuple[float, str]]:
         """
         获取与指定全量备份相关的增量备份
         
@@ -566,43 +719,48 @@ class InteractiveAssistant:
             full_backup_path: 全量备份路径
             
         Returns:
-            增量备份列表，每项包含(创建时间, 路径)
+            增量备份列表，每项包含(创建时间戳, 路径)
         """
         incremental_dir = os.path.join(full_backup_path, 'inc')
         
-        if not os.path.exists(incremental_dir):
-            return []
-        
         result = []
-        for item in os.listdir(incremental_dir):
-            if item.startswith('inc_'):
-                full_path = os.path.join(incremental_dir, item)
-                if os.path.isdir(full_path):
-                    # 获取创建时间
-                    ctime = os.path.getctime(full_path)
-                    creation_time = datetime.datetime.fromtimestamp(ctime).strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    result.append((creation_time, full_path))
+        try:
+            with os.scandir(incremental_dir) as it:
+                for entry in it:
+                    # 先按名称过滤，再使用DirEntry缓存的信息判断类型和获取创建时间
+                    if not entry.name.startswith('inc_'):
+                        continue
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    result.append((entry.stat().st_ctime, entry.path))
+        except FileNotFoundError:
+            return []
         
         # 按创建时间排序（最早的在前）
         result.sort(key=lambda x: x[0])
         
         return result
     
-    def _display_available_backups(self, backups: List[Tuple[str, str, str, str, int]]) -> None:
+    def _display_available_backups(self, backups: List[Tuple[Any, ...]]) -> None:
         """
         显示可用的备份列表
         
         Args:
-            backups: 备份列表，每项包含(类型, 名称, 路径, 创建时间, 大小)
+            backups: 备份列表，每项包含(类型, 名称, 路径, 创建时间戳, 大小)
         """
         if not backups:
             click.echo("没有找到可用的备份")
             return
         
-        click.echo("可用的备份:")
-        for i, (backup_type, name, path, creation_time, size) in enumerate(backups, 1):
-            click.echo(f"  {i}. {backup_type}: {name}")
-            click.echo(f"     创建时间: {creation_time}")
-            click.echo(f"     路径: {path}")
-            click.echo(f"     大小: {format_size(size)}") 
\ No newline at end of file
+        # 先拼接全部内容，再一次性输出
+        lines = ["可用的备份:"]
+        append = lines.append
+        for i, (backup_type, name, path, ctime, size, *_) in enumerate(backups, 1):
+            creation_time = datetime.datetime.fromtimestamp(ctime).isoformat(' ', 'seconds')
+            append(
+                f"  {i}. {backup_type}: {name}\n"
+                f"     创建时间: {creation_time}\n"
+                f"     路径: {path}\n"
+                f"     大小: {format_size(size)}"
+            )
+        click.echo("\n".join(lines)) 
\ No newline at end of file
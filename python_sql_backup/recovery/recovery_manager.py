@@ -3,15 +3,504 @@ Recovery manager module for MySQL recovery operations using XtraBackup.
 """
 import os
 import time
+import atexit
 import shutil
 import logging
 import subprocess
 import tarfile
+import gzip
+import io
+import queue
+import threading
+import errno
+import pwd
+import grp
+import re
+import shlex
+import stat
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple, Union
+from functools import cached_property
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Collection, List, Dict, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 from python_sql_backup.config.config_manager import ConfigManager
-from python_sql_backup.utils.common import ensure_dir, get_mysql_connection
+from python_sql_backup.utils.common import (
+    ARCHIVE_SUFFIXES, ensure_dir, get_mysql_connection, is_tool_available, strip_archive_suffix
+)
+
+
+# Binary log files end in a sequence number zero-padded to at least six digits
+# (e.g. mysql-bin.000003; it keeps growing past mysql-bin.999999)
+BINLOG_FILE_PATTERN = re.compile(r'\.\d{6,}$')
+
+
+def _binlog_sort_key(name: str) -> Tuple[str, int]:
+    """Sort key for binlog file names: (base name, sequence number)."""
+    base, _, seq = name.rpartition('.')
+    return base, int(seq)
+
+
+# Buffer size for bulk data file copies (shutil defaults to 64 KiB)
+COPY_BUFSIZE = 1 << 20
+
+# Bytes handed to a single os.sendfile call when copying files
+SENDFILE_CHUNK = 64 * 1024 * 1024
+
+# Kernel buffer for pipes between producer/consumer processes (the default is
+# 64 KiB; 1 MiB is the default unprivileged maximum, fs.pipe-max-size)
+PIPE_SIZE = 1 << 20
+
+# Read and member copy buffer for the pure-Python tar.gz extraction fallback
+TAR_BUFSIZE = 2 * 1024 * 1024
+# Buffer for decompressed data in that fallback
+TAR_STREAM_BUFSIZE = 4 * 1024 * 1024
+
+# ioctl request number for FICLONE (reflink a whole file on btrfs/XFS)
+_FICLONE = 0x40049409
+_HAS_COPY_FILE_RANGE = hasattr(os, 'copy_file_range')
+_HAS_SENDFILE = hasattr(os, 'sendfile')
+
+# Errors meaning "this fast path is not available here", not a real I/O failure
+_FAST_COPY_UNSUPPORTED = {errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.EOPNOTSUPP, errno.ENOSYS, errno.EBADF}
+
+
+def _available_memory() -> Optional[int]:
+    """
+    Get the amount of memory available to new processes.
+    
+    Reads MemAvailable from /proc/meminfo, falling back to psutil (when
+    installed) on systems without it.
+    
+    Returns:
+        Available memory in bytes, or None if it cannot be determined.
+    """
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    return None
+
+
+def _prefetch_tree(path: str) -> None:
+    """
+    Ask the kernel to read every file under a directory into the page cache.
+    
+    Best effort: errors are ignored, the data is read again by xtrabackup anyway.
+    
+    Args:
+        path: Directory to prefetch.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        try:
+                            fd = os.open(entry.path, os.O_RDONLY)
+                            try:
+                                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                            finally:
+                                os.close(fd)
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+
+
+def _fadvise(fd: int, offset: int, length: int, advice: int) -> None:
+    """Give the kernel an access pattern hint; silently ignored where unsupported."""
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except (AttributeError, OSError):
+        pass
+
+
+def _seq_open(path: str, buffering: int = 0):
+    """
+    Open a file for a single front-to-back read.
+    
+    Hints the kernel to use a large readahead window for the file.
+    
+    Args:
+        path: File path.
+        buffering: Buffering policy passed to open().
+        
+    Returns:
+        The file object opened in binary read mode.
+    """
+    f = open(path, 'rb', buffering=buffering)
+    _fadvise(f.fileno(), 0, 0, getattr(os, 'POSIX_FADV_SEQUENTIAL', 0))
+    return f
+
+
+def _rewind(fsrc, fdst) -> None:
+    """Reset both files so a copy can start over from the beginning."""
+    os.lseek(fsrc.fileno(), 0, os.SEEK_SET)
+    os.ftruncate(fdst.fileno(), 0)
+    os.lseek(fdst.fileno(), 0, os.SEEK_SET)
+
+
+def _copy_contents(fsrc, fdst) -> None:
+    """
+    Copy file contents with os.sendfile, falling back to a large-buffer copy.
+    
+    Args:
+        fsrc: Source file opened for binary reading.
+        fdst: Destination file opened for binary writing.
+    """
+    if _HAS_SENDFILE:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        try:
+            offset = 0
+            while True:
+                sent = os.sendfile(out_fd, in_fd, None, SENDFILE_CHUNK)
+                if not sent:
+                    break
+                offset += sent
+                # Already copied; don't let it push hot pages out of the page cache
+                _fadvise(in_fd, 0, offset, getattr(os, 'POSIX_FADV_DONTNEED', 0))
+            return
+        except OSError as e:
+            if e.errno not in _FAST_COPY_UNSUPPORTED:
+                raise
+            _rewind(fsrc, fdst)
+    
+    shutil.copyfileobj(fsrc, fdst, length=COPY_BUFSIZE)
+
+
+def _reflink_or_copy(src: str, dst: str) -> str:
+    """
+    Copy a file using a reflink or in-kernel copy when the filesystem allows it.
+    
+    Tries FICLONE first (copy-on-write clone on btrfs/XFS), then
+    os.copy_file_range, and finally falls back to _copy_contents.
+    
+    Args:
+        src: Source file path.
+        dst: Destination file path.
+        
+    Returns:
+        The destination path.
+    """
+    with _seq_open(src) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(out_fd, _FICLONE, in_fd)
+                copied = True
+            except OSError as e:
+                if e.errno not in _FAST_COPY_UNSUPPORTED:
+                    raise
+                copied = False
+        else:
+            copied = False
+        
+        if not copied and _HAS_COPY_FILE_RANGE:
+            remaining = os.fstat(in_fd).st_size
+            try:
+                while remaining > 0:
+                    sent = os.copy_file_range(in_fd, out_fd, remaining)
+                    if sent == 0:
+                        break
+                    remaining -= sent
+                copied = True
+            except OSError as e:
+                if e.errno not in _FAST_COPY_UNSUPPORTED:
+                    raise
+                _rewind(fsrc, fdst)
+        
+        if not copied:
+            _copy_contents(fsrc, fdst)
+    
+    shutil.copystat(src, dst)
+    return dst
+
+
+def _copy_batch(pairs: List[Tuple[str, str]]) -> None:
+    """Copy a batch of (source, destination) files."""
+    for src, dst in pairs:
+        _reflink_or_copy(src, dst)
+
+
+def _parallel_copytree(
+    src: str,
+    dst: str,
+    workers: int,
+    batch_size: int = 64,
+    exclude: Collection[str] = ()
+) -> None:
+    """
+    Copy a directory tree, creating directories up front and copying files in parallel.
+    
+    Files go through _reflink_or_copy, so on reflink-capable filesystems
+    (btrfs, XFS with reflink=1) the whole tree is cloned copy-on-write and
+    no file data is written. Symlinks are followed, like shutil.copytree
+    with its defaults.
+    
+    Args:
+        src: Source directory.
+        dst: Destination directory (may already exist).
+        workers: Number of copy threads.
+        batch_size: Number of files handed to a worker at a time.
+        exclude: Names of top-level files and directories in src that are not copied.
+    """
+    dirs = []
+    files = []
+    for dirpath, dirnames, filenames in os.walk(src, followlinks=True):
+        target = os.path.join(dst, os.path.relpath(dirpath, src))
+        os.makedirs(target, exist_ok=True)
+        dirs.append((dirpath, target))
+        if exclude and dirpath == src:
+            dirnames[:] = [name for name in dirnames if name not in exclude]
+            filenames = [name for name in filenames if name not in exclude]
+        files.extend((os.path.join(dirpath, name), os.path.join(target, name)) for name in filenames)
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(_copy_batch, files[i:i + batch_size])
+            for i in range(0, len(files), batch_size)
+        ]
+        for future in futures:
+            future.result()
+    
+    # Directory timestamps last, after their contents have been written
+    for dirpath, target in reversed(dirs):
+        shutil.copystat(dirpath, target)
+
+
+# MySQL connections shared by recovery managers, keyed by (host, port, user)
+_CONNECTIONS: Dict[Tuple[str, str, str], Any] = {}
+_CONNECTIONS_LOCK = threading.Lock()
+
+
+def _close_connections() -> None:
+    """Close all shared MySQL connections (registered with atexit)."""
+    with _CONNECTIONS_LOCK:
+        for connection in _CONNECTIONS.values():
+            try:
+                connection.close()
+            except Exception:
+                pass
+        _CONNECTIONS.clear()
+
+
+atexit.register(_close_connections)
+
+logger = logging.getLogger('RecoveryManager')
+_log_listener: Optional[QueueListener] = None
+
+
+def _configure_logging(log_dir: str) -> None:
+    """
+    Attach the recovery log handlers to the module logger (once per process).
+    
+    Records are queued by the caller and written to recovery.log and the
+    console on a background QueueListener thread, keeping file I/O off the
+    restore path. The listener is flushed and stopped at exit.
+    
+    Args:
+        log_dir: Directory holding recovery.log.
+    """
+    global _log_listener
+    if logger.handlers:
+        return
+    
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler = RotatingFileHandler(
+        os.path.join(log_dir, 'recovery.log'),
+        maxBytes=10 * 1024 * 1024,
+        backupCount=5
+    )
+    handlers = (file_handler, logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+# Files xtrabackup keeps in a backup directory that --copy-back does not restore
+_XTRABACKUP_META_FILES = frozenset({
+    'backup-my.cnf',
+    'xtrabackup_binlog_info',
+    'xtrabackup_checkpoints',
+    'xtrabackup_galera_info',
+    'xtrabackup_info',
+    'xtrabackup_logfile',
+    'xtrabackup_slave_info',
+    'xtrabackup_tablespaces',
+})
+
+# Top-level entries of a backup directory that do not belong in the data directory:
+# the xtrabackup files above, this tool's metadata and the incrementals stored under inc/
+_COPY_BACK_EXCLUDE = _XTRABACKUP_META_FILES | {'inc', 'metadata.txt'}
+
+
+def _can_reflink(src_file: str, dst_dir: str) -> bool:
+    """
+    Check whether src_file can be cloned copy-on-write into dst_dir.
+    
+    Args:
+        src_file: An existing regular file.
+        dst_dir: Target directory.
+        
+    Returns:
+        True if a FICLONE into dst_dir succeeds.
+    """
+    if fcntl is None:
+        return False
+    
+    probe = os.path.join(dst_dir, f'.reflink_probe_{os.getpid()}')
+    try:
+        with open(src_file, 'rb') as fsrc, open(probe, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        return False
+    finally:
+        try:
+            os.remove(probe)
+        except OSError:
+            pass
+
+
+def _accessible_by(path: str, uid: int, gid: int, write: bool = False) -> bool:
+    """
+    Check from its mode bits whether uid/gid may read (or write) path.
+    
+    Directories also need the search bit. Supplementary groups and ACLs are
+    not considered, so a False result may be overly cautious.
+    
+    Args:
+        path: File or directory to check.
+        uid: User ID.
+        gid: Group ID.
+        write: Check for write access instead of read access.
+        
+    Returns:
+        True if the owner, group or other permission bits grant access.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    
+    need = stat.S_IWUSR if write else stat.S_IRUSR
+    if stat.S_ISDIR(st.st_mode):
+        need |= stat.S_IXUSR
+    return _mode_grants(st, uid, gid, need)
+
+
+def _mode_grants(st: os.stat_result, uid: int, gid: int, need: int) -> bool:
+    """
+    Check whether the mode bits of a stat result grant uid/gid the given access.
+    
+    Args:
+        st: Stat result of the file or directory.
+        uid: User ID.
+        gid: Group ID.
+        need: Required owner permission bits (S_IRUSR, S_IWUSR, S_IXUSR).
+        
+    Returns:
+        True if the owner, group or other permission bits grant access.
+    """
+    if st.st_uid == uid:
+        shift = 0
+    elif st.st_gid == gid:
+        shift = 3
+    else:
+        shift = 6
+    need >>= shift
+    return st.st_mode & need == need
+
+
+def _reachable_by(path: str, uid: int, gid: int) -> bool:
+    """
+    Check that uid/gid may search every ancestor directory of path.
+    
+    Args:
+        path: File or directory to check.
+        uid: User ID.
+        gid: Group ID.
+        
+    Returns:
+        True if every directory above path has the search bit for uid/gid.
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    while True:
+        try:
+            if not _mode_grants(os.stat(parent), uid, gid, stat.S_IXUSR):
+                return False
+        except OSError:
+            return False
+        if parent == os.path.dirname(parent):
+            return True
+        parent = os.path.dirname(parent)
+
+
+def _tree_readable_by(path: str, uid: int, gid: int) -> bool:
+    """
+    Check that uid/gid may read every file and list every directory of a tree.
+    
+    Args:
+        path: Root of the tree.
+        uid: User ID.
+        gid: Group ID.
+        
+    Returns:
+        True if the whole tree is readable, False at the first entry that is not.
+    """
+    if not _accessible_by(path, uid, gid):
+        return False
+    
+    pending = [path]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as it:
+                for entry in it:
+                    st = entry.stat()
+                    if stat.S_ISDIR(st.st_mode):
+                        if not _mode_grants(st, uid, gid, stat.S_IRUSR | stat.S_IXUSR):
+                            return False
+                        pending.append(entry.path)
+                    elif not _mode_grants(st, uid, gid, stat.S_IRUSR):
+                        return False
+        except OSError:
+            return False
+    
+    return True
 
 
 class RecoveryManager:
@@ -28,17 +517,286 @@ class RecoveryManager:
         self.config = config_manager
         self.backup_dir = self.config.get('BACKUP', 'backup_dir')
         self.threads = int(self.config.get('BACKUP', 'threads', fallback='4'))
+        self.prepare_memory = self.config.get('BACKUP', 'prepare_memory', fallback='').strip()
+        self.incremental_parallel = int(self.config.get('BACKUP', 'incremental_parallel', fallback='2'))
+        self.use_reflink_copyback = self.config.get('BACKUP', 'use_reflink_copyback', fallback='false').lower() == 'true'
         
-        # Configure logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(self.backup_dir, 'recovery.log')),
-                logging.StreamHandler()
-            ]
+        # Where _backup_existing_data moved the data directory, so a failed restore can move it back
+        self._moved_datadir_to: Optional[str] = None
+        
+        # How the MySQL service is stopped/started on this host, resolved once
+        self._container_id = os.environ.get('MYSQL_CONTAINER_ID')
+        self._service_manager = self._resolve_service_manager()
+        
+        # Connection settings for the mysql client, resolved once
+        self._db_config = dict(self.config.get_section('DATABASE'))
+        self._mysql_args_base = [
+            f"--host={self._db_config.get('host', 'localhost')}",
+            f"--port={self._db_config.get('port', '3306')}",
+            f"--user={self._db_config.get('user', 'root')}"
+        ]
+        
+        # Configure logging (handlers are attached only once per process)
+        _configure_logging(self.backup_dir)
+        self.logger = logger
+    
+    def _resolve_service_manager(self) -> Optional[str]:
+        """
+        确定本机管理MySQL服务的方式
+        
+        设置了 MYSQL_CONTAINER_ID 时使用Docker，其次是以systemd启动的系统上的systemctl，
+        最后是service命令。
+        
+        Returns:
+            'docker'、'systemctl'、'service'，都不可用时返回None
+        """
+        if self._container_id:
+            return 'docker'
+        if shutil.which('systemctl') and os.path.isdir('/run/systemd/system'):
+            return 'systemctl'
+        if shutil.which('service'):
+            return 'service'
+        return None
+    
+    def _service_command(self, action: str) -> List[str]:
+        """
+        构建启动/停止MySQL服务的命令
+        
+        Args:
+            action: 'start' 或 'stop'
+            
+        Returns:
+            命令参数列表
+        """
+        if self._service_manager == 'docker':
+            return ['docker', action, self._container_id]
+        if self._service_manager == 'systemctl':
+            return ['systemctl', action, 'mysql']
+        if self._service_manager == 'service':
+            return ['service', 'mysql', action]
+        raise RuntimeError("无法确定MySQL服务的管理方式（systemctl/service/docker均不可用）")
+    
+    def _stop_mysql(self) -> None:
+        """停止MySQL服务"""
+        subprocess.run(self._service_command('stop'), check=True, capture_output=True, text=True)
+    
+    def _start_mysql(self) -> None:
+        """启动MySQL服务"""
+        subprocess.run(self._service_command('start'), check=True, capture_output=True, text=True)
+    
+    def _mysql_is_running(self) -> bool:
+        """
+        检查MySQL服务是否在运行
+        
+        Returns:
+            服务（或容器）正在运行时返回True
+        """
+        if self._service_manager == 'docker':
+            result = subprocess.run(
+                ['docker', 'inspect', '--format={{.State.Running}}', self._container_id],
+                capture_output=True, text=True
+            )
+            return result.returncode == 0 and result.stdout.strip() == 'true'
+        if self._service_manager == 'systemctl':
+            return subprocess.run(['systemctl', 'is-active', '--quiet', 'mysql']).returncode == 0
+        if self._service_manager == 'service':
+            result = subprocess.run(
+                ['service', 'mysql', 'status'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            return result.returncode == 0
+        return False
+    
+    def _conn(self):
+        """
+        Get a MySQL connection shared with other managers for the same server.
+        
+        A new connection is opened only if there is none yet or the cached one
+        has been closed (e.g. because MySQL was restarted).
+        
+        Returns:
+            MySQL connection object.
+        """
+        key = (
+            self._db_config.get('host', 'localhost'),
+            self._db_config.get('port', '3306'),
+            self._db_config.get('user', 'root')
         )
-        self.logger = logging.getLogger('RecoveryManager')
+        with _CONNECTIONS_LOCK:
+            connection = _CONNECTIONS.get(key)
+            if connection is None or not connection.is_connected():
+                connection = get_mysql_connection(self.config)
+                _CONNECTIONS[key] = connection
+            return connection
+    
+    @cached_property
+    def datadir(self) -> str:
+        """
+        MySQL data directory, queried from the server once per manager.
+        
+        The value is cached so it is still available after MySQL has been
+        stopped for the restore.
+        """
+        with self._conn().cursor() as cursor:
+            cursor.execute("SELECT @@datadir")
+            return cursor.fetchone()[0]
+    
+    @staticmethod
+    def _chown_tree(path: str, uid: int, gid: int) -> None:
+        """
+        Recursively change ownership of a directory tree without following symlinks.
+        
+        Args:
+            path: Root of the tree.
+            uid: Target user id.
+            gid: Target group id.
+        """
+        os.chown(path, uid, gid, follow_symlinks=False)
+        for _, dirnames, filenames, dirfd in os.fwalk(path):
+            for name in dirnames + filenames:
+                os.chown(name, uid, gid, dir_fd=dirfd, follow_symlinks=False)
+    
+    @staticmethod
+    def _mysql_ids() -> Optional[Tuple[int, int]]:
+        """
+        Look up the uid and gid of the mysql user and group.
+        
+        Returns:
+            (uid, gid), or None if either does not exist.
+        """
+        try:
+            return pwd.getpwnam('mysql').pw_uid, grp.getgrnam('mysql').gr_gid
+        except KeyError:
+            return None
+    
+    def _copy_back_ids(self, prepared_backup_path: str, datadir: str) -> Optional[Tuple[int, int]]:
+        """
+        Decide whether xtrabackup --copy-back can run as the mysql user.
+        
+        Files copied back by the mysql user already have the right owner, so the
+        chown pass over the data directory can be skipped. That needs root (to
+        switch user), an existing data directory the mysql user can reach and
+        write to, and a prepared backup it can reach and read in full.
+        
+        Args:
+            prepared_backup_path: Path to the prepared backup.
+            datadir: MySQL data directory.
+            
+        Returns:
+            (uid, gid) to run the copy-back as, or None to run it as the current user.
+        """
+        if os.geteuid() != 0:
+            return None
+        ids = self._mysql_ids()
+        if ids is None:
+            return None
+        
+        uid, gid = ids
+        if not (_reachable_by(datadir, uid, gid) and _accessible_by(datadir, uid, gid, write=True)):
+            return None
+        if not (_reachable_by(prepared_backup_path, uid, gid)
+                and _tree_readable_by(prepared_backup_path, uid, gid)):
+            return None
+        return ids
+    
+    @staticmethod
+    def _clear_directory(path: str) -> None:
+        """
+        Remove everything inside a directory, keeping the directory itself.
+        
+        Args:
+            path: Directory to empty.
+        """
+        with os.scandir(path) as it:
+            entries = list(it)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+    
+    def _chown_datadir(self, datadir: str) -> None:
+        """
+        Give the mysql user ownership of the restored data directory.
+        
+        Top-level entries are processed in parallel, each with its own fwalk.
+        
+        Args:
+            datadir: MySQL data directory.
+        """
+        ids = self._mysql_ids()
+        if ids is None:
+            raise RuntimeError("Cannot resolve mysql user/group")
+        uid, gid = ids
+        
+        try:
+            os.chown(datadir, uid, gid, follow_symlinks=False)
+            with os.scandir(datadir) as it:
+                entries = list(it)
+            
+            with ThreadPoolExecutor(max_workers=max(1, self.threads)) as executor:
+                futures = []
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        futures.append(executor.submit(self._chown_tree, entry.path, uid, gid))
+                    else:
+                        os.chown(entry.path, uid, gid, follow_symlinks=False)
+                for future in futures:
+                    future.result()
+        except OSError as e:
+            raise RuntimeError(f"Failed to fix permissions on {datadir}: {e}")
+    
+    def _use_memory_arg(self) -> Optional[str]:
+        """
+        Build the xtrabackup --use-memory option for prepare runs.
+        
+        BACKUP.prepare_memory (e.g. 8G) takes precedence; otherwise half of the
+        currently available memory is used for the buffer pool.
+        
+        Returns:
+            The option string, or None if available memory is unknown.
+        """
+        if self.prepare_memory:
+            return f'--use-memory={self.prepare_memory}'
+        
+        available = _available_memory()
+        if not available:
+            return None
+        return f'--use-memory={max(available // 2 // (1 << 20), 256)}M'
+    
+    def _run_logged(self, cmd: List[str], run_as: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Run a command, streaming its combined output line by line to the debug log.
+        
+        When debug logging is off, stdout is discarded and only the tail of
+        stderr is kept (undecoded until needed) for error reporting.
+        
+        Args:
+            cmd: Command and arguments.
+            run_as: Optional (uid, gid) to run the command as (requires root).
+            
+        Raises:
+            subprocess.CalledProcessError: If the command exits with a non-zero status.
+                The last lines of output are attached as ``stderr``.
+        """
+        # Switched in the child by Popen itself, so no preexec_fn (unsafe with threads)
+        user_kwargs = {'user': run_as[0], 'group': run_as[1], 'extra_groups': []} if run_as else {}
+        tail = deque(maxlen=50)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            with subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, **user_kwargs
+            ) as proc:
+                for line in proc.stdout:
+                    line = line.rstrip()
+                    tail.append(line)
+                    self.logger.debug(line)
+        else:
+            with subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, **user_kwargs) as proc:
+                tail.extend(proc.stderr)
+            tail = [line.decode(errors='replace').rstrip() for line in tail]
+        
+        if proc.returncode != 0:
+            output = '\n'.join(tail)
+            raise subprocess.CalledProcessError(proc.returncode, cmd, output=output, stderr=output)
     
     def _prepare_backup(self, backup_path: str, apply_log_only: bool = False) -> None:
         """
@@ -49,7 +807,7 @@ class RecoveryManager:
             apply_log_only: Whether to use --apply-log-only (for incremental prepare).
         """
         # 如果是压缩文件，先解压
-        if backup_path.endswith('.tar.gz'):
+        if backup_path.endswith(ARCHIVE_SUFFIXES):
             backup_path = self._uncompress_backup(backup_path)
         
         cmd = ['xtrabackup', '--prepare', f'--target-dir={backup_path}']
@@ -59,12 +817,15 @@ class RecoveryManager:
         
         cmd.append(f'--parallel={self.threads}')
         
+        use_memory = self._use_memory_arg()
+        if use_memory:
+            cmd.append(use_memory)
+        
         self.logger.info(f"Preparing backup at {backup_path}")
-        self.logger.debug(f"Executing command: {' '.join(cmd)}")
+        self.logger.debug(f"Executing command: {shlex.join(cmd)}")
         
         try:
-            process = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            self.logger.debug(f"Command output: {process.stdout}")
+            self._run_logged(cmd)
             self.logger.info(f"Backup preparation completed successfully for {backup_path}")
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Backup preparation failed: {e}")
@@ -80,19 +841,54 @@ class RecoveryManager:
             incremental_paths: List of incremental backup paths, in chronological order.
         """
         # 如果是压缩文件，先解压
-        if full_backup_path.endswith('.tar.gz'):
+        if full_backup_path.endswith(ARCHIVE_SUFFIXES):
             full_backup_path = self._uncompress_backup(full_backup_path)
         
+        # Get the next incrementals ready (extracted / read ahead) in the background while
+        # the full backup and the earlier incrementals are prepared. Only a few are staged
+        # ahead, so extracted incrementals don't pile up on disk.
+        lookahead = max(1, self.incremental_parallel)
+        with ThreadPoolExecutor(max_workers=lookahead) as stager:
+            staged = deque(stager.submit(self._stage_incremental, path) for path in incremental_paths[:lookahead])
+            try:
+                self._apply_incrementals(full_backup_path, incremental_paths, staged, stager, lookahead)
+            except BaseException:
+                # Don't extract incrementals that will never be applied
+                for future in staged:
+                    future.cancel()
+                raise
+    
+    def _apply_incrementals(
+        self,
+        full_backup_path: str,
+        incremental_paths: List[str],
+        staged: deque,
+        stager: ThreadPoolExecutor,
+        lookahead: int
+    ) -> None:
+        """
+        Prepare the full backup and apply the incrementals to it in order.
+        
+        Args:
+            full_backup_path: Path to the (uncompressed) full backup.
+            incremental_paths: List of incremental backup paths, in chronological order.
+            staged: Futures of the incrementals being staged, oldest first.
+            stager: Executor that stages the incrementals.
+            lookahead: Number of incrementals staged ahead of the one being applied.
+        """
         # First, prepare the full backup with --apply-log-only
         self._prepare_backup(full_backup_path, apply_log_only=True)
         
+        # xtrabackup applies one --incremental-dir per run, so give every pass a
+        # large buffer pool instead of the 128M default
+        use_memory = self._use_memory_arg()
+        
         # Then, apply each incremental backup, one by one
-        for i, inc_path in enumerate(incremental_paths):
-            self.logger.info(f"Applying incremental backup {i+1}/{len(incremental_paths)}: {inc_path}")
-            
-            # 如果是压缩文件，先解压
-            if inc_path.endswith('.tar.gz'):
-                inc_path = self._uncompress_backup(inc_path)
+        for i in range(len(incremental_paths)):
+            self.logger.info(f"Applying incremental backup {i+1}/{len(incremental_paths)}: {incremental_paths[i]}")
+            if i + lookahead < len(incremental_paths):
+                staged.append(stager.submit(self._stage_incremental, incremental_paths[i + lookahead]))
+            inc_path = staged.popleft().result()
             
             # For all but the last incremental, use --apply-log-only
             apply_log_only = i < len(incremental_paths) - 1
@@ -108,20 +904,76 @@ class RecoveryManager:
             
             cmd.append(f'--parallel={self.threads}')
             
-            self.logger.debug(f"Executing command: {' '.join(cmd)}")
+            if use_memory:
+                cmd.append(use_memory)
+            
+            self.logger.debug(f"Executing command: {shlex.join(cmd)}")
             
             try:
-                process = subprocess.run(cmd, check=True, capture_output=True, text=True)
-                self.logger.debug(f"Command output: {process.stdout}")
+                self._run_logged(cmd)
                 self.logger.info(f"Incremental backup applied successfully: {inc_path}")
             except subprocess.CalledProcessError as e:
                 self.logger.error(f"Failed to apply incremental backup: {e}")
                 self.logger.error(f"Error output: {e.stderr}")
                 raise RuntimeError(f"Failed to apply incremental backup: {e}")
     
+    def _stage_incremental(self, inc_path: str) -> str:
+        """
+        Get an incremental backup ready for xtrabackup.
+        
+        Compressed incrementals are extracted; plain directories are read
+        ahead into the page cache.
+        
+        Args:
+            inc_path: Path to the incremental backup.
+            
+        Returns:
+            Path of the incremental backup directory.
+        """
+        # 如果是压缩文件，先解压
+        if inc_path.endswith(ARCHIVE_SUFFIXES):
+            return self._uncompress_backup(inc_path)
+        
+        _prefetch_tree(inc_path)
+        return inc_path
+    
+    def _extract_with_tar(self, archive_path: str, dest_dir: str) -> None:
+        """
+        使用 zstd（tar.zst）或 pigz（不可用时用 gzip）解压并通过管道交给 tar 解包
+        
+        Args:
+            archive_path: tar.gz/tar.zst文件路径
+            dest_dir: 解包目标目录
+        """
+        if archive_path.endswith('.tar.zst'):
+            decompress_cmd = ['zstd', '-d', '-T0', '-c', archive_path]
+        elif is_tool_available('pigz'):
+            decompress_cmd = ['pigz', '-p', str(max(1, self.threads)), '-dc', archive_path]
+        else:
+            decompress_cmd = ['gzip', '-dc', archive_path]
+        tar_cmd = ['tar', '-xf', '-', '-C', dest_dir]
+        
+        self.logger.debug(f"Executing command: {shlex.join(decompress_cmd)} | {shlex.join(tar_cmd)}")
+        # 解压程序的stderr写入临时文件：若用管道且在tar结束后才读取，管道写满会使两端互相等待
+        with tempfile.TemporaryFile() as decompress_err_file, subprocess.Popen(
+            decompress_cmd, stdout=subprocess.PIPE, stderr=decompress_err_file, pipesize=PIPE_SIZE
+        ) as decompress_proc:
+            tar_proc = subprocess.Popen(tar_cmd, stdin=decompress_proc.stdout, stderr=subprocess.PIPE)
+            # Let the decompressor get SIGPIPE if tar exits early
+            decompress_proc.stdout.close()
+            _, tar_err = tar_proc.communicate()
+            decompress_proc.wait()
+            decompress_err_file.seek(0)
+            decompress_err = decompress_err_file.read()
+        
+        if decompress_proc.returncode != 0:
+            raise RuntimeError(f"{decompress_cmd[0]} 执行失败: {decompress_err.decode(errors='replace').strip()}")
+        if tar_proc.returncode != 0:
+            raise RuntimeError(f"tar 执行失败: {tar_err.decode(errors='replace').strip()}")
+    
     def _uncompress_backup(self, backup_path: str) -> str:
         """
-        解压缩tar.gz格式的备份
+        解压缩tar.gz/tar.zst格式的备份
         
         Args:
             backup_path: 压缩文件路径
@@ -129,15 +981,29 @@ class RecoveryManager:
         Returns:
             解压后的目录路径
         """
-        if not backup_path.endswith('.tar.gz'):
+        if not backup_path.endswith(ARCHIVE_SUFFIXES):
             return backup_path
         
-        extract_path = backup_path[:-7]  # 移除 .tar.gz
+        extract_path = strip_archive_suffix(backup_path)
         self.logger.info(f"解压备份 {backup_path} 到 {extract_path}")
         
         try:
-            with tarfile.open(backup_path, "r:gz") as tar:
-                tar.extractall(path=os.path.dirname(extract_path))
+            if backup_path.endswith('.tar.zst'):
+                # No pure-Python zstd decoder to fall back to
+                if not (is_tool_available('tar') and is_tool_available('zstd')):
+                    raise RuntimeError("解压 tar.zst 备份需要 tar 和 zstd 命令")
+                self._extract_with_tar(backup_path, os.path.dirname(extract_path))
+            elif is_tool_available('tar') and (is_tool_available('pigz') or is_tool_available('gzip')):
+                self._extract_with_tar(backup_path, os.path.dirname(extract_path))
+            else:
+                # Single streaming pass over the archive ('r|'): decompressed data goes
+                # through a large buffer, and tarfile copies members with a large buffer
+                # instead of its 16 KiB default
+                with _seq_open(backup_path, buffering=TAR_BUFSIZE) as raw, \
+                        gzip.GzipFile(fileobj=raw, mode='rb') as gz, \
+                        io.BufferedReader(gz, buffer_size=TAR_STREAM_BUFSIZE) as buffered, \
+                        tarfile.open(fileobj=buffered, mode='r|', copybufsize=TAR_BUFSIZE) as tar:
+                    tar.extractall(path=os.path.dirname(extract_path))
             
             self.logger.info(f"备份解压完成: {extract_path}")
             return extract_path
@@ -145,23 +1011,24 @@ class RecoveryManager:
             self.logger.error(f"备份解压失败: {e}")
             raise RuntimeError(f"备份解压失败: {e}")
     
-    def _backup_existing_data(self, target_dir: Optional[str] = None) -> str:
+    def _backup_existing_data(self, target_dir: Optional[str] = None, move: bool = False) -> str:
         """
         Back up existing MySQL data directory before restoration.
         
+        With move=True the data directory is renamed to the backup path when both
+        are on the same filesystem, and an empty data directory is recreated in
+        its place. Nothing is copied; xtrabackup --copy-back fills the empty
+        directory afterwards. Otherwise the data directory is copied.
+        
         Args:
             target_dir: Custom directory to store the backup. If None, a default is used.
+            move: Whether the data directory may be moved out of the way instead of copied.
             
         Returns:
             Path to the backup of the existing data.
         """
-        db_config = self.config.get_section('DATABASE')
-        
-        # Try to determine the data directory
-        connection = get_mysql_connection(self.config)
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT @@datadir")
-            datadir = cursor.fetchone()[0]
+        # Determine the data directory (cached, MySQL may already be stopped)
+        datadir = self.datadir
         
         # Create a backup directory
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -179,47 +1046,25 @@ class RecoveryManager:
             
             backup_path = os.path.join(day_dir, f'pre_restore_backup_{timestamp}')
         
-        ensure_dir(backup_path)
-        
         self.logger.info(f"Backing up existing MySQL data directory {datadir} to {backup_path}")
         
         # Shutdown MySQL
         self.logger.info("Stopping MySQL service")
         try:
-            # 尝试使用systemctl停止MySQL
-            try:
-                subprocess.run(['systemctl', 'stop', 'mysql'], check=True, capture_output=True, text=True)
-            except subprocess.CalledProcessError:
-                # 如果systemctl失败，尝试使用service命令
-                try:
-                    subprocess.run(['service', 'mysql', 'stop'], check=True, capture_output=True, text=True)
-                except subprocess.CalledProcessError:
-                    # 如果service命令也失败，尝试使用Docker命令
-                    try:
-                        # 检查是否在Docker环境中
-                        container_id = os.environ.get('MYSQL_CONTAINER_ID')
-                        if container_id:
-                            subprocess.run(['docker', 'stop', container_id], check=True, capture_output=True, text=True)
-                        else:
-                            raise RuntimeError("无法确定MySQL容器ID")
-                    except Exception:
-                        raise RuntimeError("无法停止MySQL服务")
+            self._stop_mysql()
         except Exception as e:
             self.logger.error(f"Failed to stop MySQL service: {e}")
             raise RuntimeError(f"Failed to stop MySQL service: {e}")
         
+        self._moved_datadir_to = None
         try:
-            # Copy the data directory
-            for item in os.listdir(datadir):
-                src = os.path.join(datadir, item)
-                dst = os.path.join(backup_path, item)
-                
-                if os.path.isdir(src):
-                    self.logger.debug(f"Copying directory {src} to {dst}")
-                    shutil.copytree(src, dst)
-                else:
-                    self.logger.debug(f"Copying file {src} to {dst}")
-                    shutil.copy2(src, dst)
+            if move and self._move_datadir(datadir, backup_path):
+                self._moved_datadir_to = backup_path
+                self.logger.info(f"Moved the data directory to {backup_path}")
+            else:
+                # Copy the data directory
+                ensure_dir(backup_path)
+                _parallel_copytree(datadir, backup_path, self.threads)
             
             self.logger.info(f"Successfully backed up existing data to {backup_path}")
             return backup_path
@@ -229,29 +1074,71 @@ class RecoveryManager:
             
             # Start MySQL again
             try:
-                # 尝试使用systemctl启动MySQL
-                try:
-                    subprocess.run(['systemctl', 'start', 'mysql'], check=True, capture_output=True, text=True)
-                except subprocess.CalledProcessError:
-                    # 如果systemctl失败，尝试使用service命令
-                    try:
-                        subprocess.run(['service', 'mysql', 'start'], check=True, capture_output=True, text=True)
-                    except subprocess.CalledProcessError:
-                        # 如果service命令也失败，尝试使用Docker命令
-                        try:
-                            # 检查是否在Docker环境中
-                            container_id = os.environ.get('MYSQL_CONTAINER_ID')
-                            if container_id:
-                                subprocess.run(['docker', 'start', container_id], check=True, capture_output=True, text=True)
-                            else:
-                                raise RuntimeError("无法确定MySQL容器ID")
-                        except Exception:
-                            raise RuntimeError("无法启动MySQL服务")
+                self._start_mysql()
             except Exception as e2:
                 self.logger.error(f"Failed to restart MySQL service: {e2}")
             
             raise RuntimeError(f"Failed to backup existing data: {e}")
     
+    def _move_datadir(self, datadir: str, backup_path: str) -> bool:
+        """
+        Rename the data directory to backup_path and recreate it empty.
+        
+        Args:
+            datadir: MySQL data directory.
+            backup_path: Where to move the data directory (must not exist yet).
+            
+        Returns:
+            True if the data directory was moved, False if it has to be copied.
+        """
+        try:
+            st = os.stat(datadir)
+            # A mount point cannot be renamed, and a cross-device target needs a copy
+            if (st.st_dev != os.stat(os.path.dirname(os.path.abspath(datadir))).st_dev
+                    or st.st_dev != os.stat(os.path.dirname(os.path.abspath(backup_path))).st_dev):
+                return False
+            os.rename(datadir, backup_path)
+        except OSError as e:
+            self.logger.info(f"Cannot move the data directory ({e}), copying it instead")
+            return False
+        
+        os.mkdir(datadir)
+        os.chmod(datadir, stat.S_IMODE(st.st_mode))
+        os.chown(datadir, st.st_uid, st.st_gid)
+        return True
+    
+    def _undo_datadir_move(self) -> None:
+        """
+        Move the data directory moved aside by _backup_existing_data back in place.
+        
+        Called when the restore fails after the move, so MySQL starts again on its
+        original data instead of an empty or half-restored data directory.
+        """
+        moved_to = self._moved_datadir_to
+        if moved_to is None:
+            return
+        self._moved_datadir_to = None
+        
+        datadir = self.datadir
+        self.logger.info(f"Moving the original data directory back from {moved_to}")
+        try:
+            if self._mysql_is_running():
+                self._stop_mysql()
+        except Exception as e:
+            self.logger.error(f"Failed to stop MySQL service: {e}")
+        
+        try:
+            shutil.rmtree(datadir)
+            os.rename(moved_to, datadir)
+        except OSError as e:
+            self.logger.error(f"Failed to move the original data directory back, it is kept at {moved_to}: {e}")
+            return
+        
+        try:
+            self._start_mysql()
+        except Exception as e:
+            self.logger.error(f"Failed to restart MySQL service: {e}")
+    
     def _restore_backup(
         self, 
         prepared_backup_path: str, 
@@ -264,16 +1151,11 @@ class RecoveryManager:
             prepared_backup_path: Path to the prepared backup.
             specific_tables: List of specific tables to restore.
         """
-        db_config = self.config.get_section('DATABASE')
-        
-        # Try to determine the data directory
-        connection = get_mysql_connection(self.config)
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT @@datadir")
-            datadir = cursor.fetchone()[0]
+        # Determine the data directory (cached, MySQL may already be stopped)
+        datadir = self.datadir
         
         # Build the command
-        cmd = ['xtrabackup', '--copy-back', f'--target-dir={prepared_backup_path}']
+        cmd = ['xtrabackup', '--copy-back', f'--target-dir={prepared_backup_path}', '--read-buffer-size=16M']
         
         if specific_tables:
             for table in specific_tables:
@@ -283,67 +1165,50 @@ class RecoveryManager:
         
         # Shutdown MySQL if it's running
         try:
-            # 尝试使用systemctl检查MySQL状态
-            try:
-                subprocess.run(['systemctl', 'status', 'mysql'], check=True, capture_output=True, text=True)
+            if self._mysql_is_running():
                 self.logger.info("MySQL is running. Stopping the service.")
-                subprocess.run(['systemctl', 'stop', 'mysql'], check=True, capture_output=True, text=True)
-            except subprocess.CalledProcessError:
-                # 如果systemctl失败，尝试使用service命令
-                try:
-                    subprocess.run(['service', 'mysql', 'status'], check=True, capture_output=True, text=True)
-                    self.logger.info("MySQL is running. Stopping the service.")
-                    subprocess.run(['service', 'mysql', 'stop'], check=True, capture_output=True, text=True)
-                except subprocess.CalledProcessError:
-                    # 如果service命令也失败，尝试使用Docker命令
-                    try:
-                        # 检查是否在Docker环境中
-                        container_id = os.environ.get('MYSQL_CONTAINER_ID')
-                        if container_id:
-                            # 检查容器状态
-                            result = subprocess.run(['docker', 'inspect', '--format={{.State.Running}}', container_id], 
-                                                  check=True, capture_output=True, text=True)
-                            if result.stdout.strip() == 'true':
-                                self.logger.info("MySQL container is running. Stopping the container.")
-                                subprocess.run(['docker', 'stop', container_id], check=True, capture_output=True, text=True)
-                        else:
-                            self.logger.info("MySQL is not running. Proceeding with restoration.")
-                    except Exception:
-                        self.logger.info("MySQL is not running. Proceeding with restoration.")
+                self._stop_mysql()
+            else:
+                self.logger.info("MySQL is not running. Proceeding with restoration.")
         except Exception as e:
             self.logger.error(f"Error checking MySQL status: {e}")
             self.logger.info("Proceeding with restoration assuming MySQL is not running.")
         
         try:
-            # Execute the restore command
-            self.logger.debug(f"Executing command: {' '.join(cmd)}")
-            process = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            self.logger.debug(f"Command output: {process.stdout}")
+            owned_by_mysql = False
+            if not specific_tables and self._reflink_copy_back(prepared_backup_path, datadir):
+                self.logger.info("Restored data files with copy-on-write clones")
+            else:
+                # Run the copy-back as mysql when possible so the files get the right owner directly
+                run_as = self._copy_back_ids(prepared_backup_path, datadir)
+                if run_as:
+                    self.logger.info("Running copy-back as the mysql user")
+                    # Only an empty data directory can be cleared for a retry as root
+                    with os.scandir(datadir) as it:
+                        datadir_was_empty = not any(True for _ in it)
+                
+                # Execute the restore command
+                self.logger.debug(f"Executing command: {shlex.join(cmd)}")
+                try:
+                    self._run_logged(cmd, run_as=run_as)
+                    owned_by_mysql = run_as is not None
+                except subprocess.CalledProcessError as e:
+                    if not run_as or not datadir_was_empty:
+                        raise
+                    self.logger.warning(f"Copy-back as the mysql user failed, retrying as root: {e.stderr}")
+                    self._clear_directory(datadir)
+                    self._run_logged(cmd)
             
             # Fix permissions
-            self.logger.info("Fixing permissions on the data directory")
-            subprocess.run(['chown', '-R', 'mysql:mysql', datadir], check=True)
+            if owned_by_mysql:
+                self.logger.info("Data files were copied back as mysql, skipping chown")
+            else:
+                self.logger.info("Fixing permissions on the data directory")
+                self._chown_datadir(datadir)
             
             # Start MySQL service
             self.logger.info("Starting MySQL service")
-            # 尝试使用systemctl启动MySQL
-            try:
-                subprocess.run(['systemctl', 'start', 'mysql'], check=True, capture_output=True, text=True)
-            except subprocess.CalledProcessError:
-                # 如果systemctl失败，尝试使用service命令
-                try:
-                    subprocess.run(['service', 'mysql', 'start'], check=True, capture_output=True, text=True)
-                except subprocess.CalledProcessError:
-                    # 如果service命令也失败，尝试使用Docker命令
-                    try:
-                        # 检查是否在Docker环境中
-                        container_id = os.environ.get('MYSQL_CONTAINER_ID')
-                        if container_id:
-                            subprocess.run(['docker', 'start', container_id], check=True, capture_output=True, text=True)
-                        else:
-                            raise RuntimeError("无法确定MySQL容器ID")
-                    except Exception:
-                        raise RuntimeError("无法启动MySQL服务")
+            self._start_mysql()
             
             self.logger.info("Restoration completed successfully")
             
@@ -352,6 +1217,39 @@ class RecoveryManager:
             self.logger.error(f"Error output: {e.stderr}")
             raise RuntimeError(f"Restoration failed: {e}")
     
+    def _reflink_copy_back(self, prepared_backup_path: str, datadir: str) -> bool:
+        """
+        Clone a prepared backup into the data directory instead of running --copy-back.
+        
+        Only used when BACKUP.use_reflink_copyback is enabled, the data directory
+        is empty (as --copy-back requires) and both directories are on a
+        filesystem that supports reflinks.
+        
+        Args:
+            prepared_backup_path: Path to the prepared backup.
+            datadir: MySQL data directory.
+            
+        Returns:
+            True if the data was restored, False if xtrabackup should be used.
+        """
+        if not self.use_reflink_copyback:
+            return False
+        
+        probe_file = os.path.join(prepared_backup_path, 'ibdata1')
+        try:
+            with os.scandir(datadir) as it:
+                if any(True for _ in it):
+                    self.logger.info("Data directory is not empty, using xtrabackup --copy-back")
+                    return False
+        except FileNotFoundError:
+            return False
+        if not os.path.isfile(probe_file) or not _can_reflink(probe_file, datadir):
+            self.logger.info("Reflinks not supported here, using xtrabackup --copy-back")
+            return False
+        
+        _parallel_copytree(prepared_backup_path, datadir, self.threads, exclude=_COPY_BACK_EXCLUDE)
+        return True
+    
     def _apply_binlog(
         self, 
         binlog_paths: List[str], 
@@ -372,45 +1270,37 @@ class RecoveryManager:
             self.logger.info("No binary logs to apply")
             return
         
-        # Collect all binary log files
-        binlog_files = []
+        # Collect all binary log files by name. Every binlog backup copies all binlogs
+        # the server still has, so a later backup's copy of the same file replaces
+        # the earlier (possibly shorter) one instead of being replayed twice.
+        files_by_name = {}
         for binlog_dir in binlog_paths:
             # 如果是压缩文件，先解压
-            if binlog_dir.endswith('.tar.gz'):
+            if binlog_dir.endswith(ARCHIVE_SUFFIXES):
                 binlog_dir = self._uncompress_backup(binlog_dir)
-                
-            for item in os.listdir(binlog_dir):
-                if item.endswith('.000001') or item.endswith('.000002') or item.startswith('mysql-bin.'):  # Common binlog suffixes
-                    binlog_files.append(os.path.join(binlog_dir, item))
+            
+            with os.scandir(binlog_dir) as it:
+                for entry in it:
+                    if entry.is_file() and BINLOG_FILE_PATTERN.search(entry.name):
+                        files_by_name[entry.name] = entry.path
         
-        if not binlog_files:
+        if not files_by_name:
             self.logger.info("No binary log files found in the provided directories")
             return
         
-        # Sort by modification time
-        binlog_files.sort(key=os.path.getmtime)
-        
-        # Create a command file for mysqlbinlog
-        cmd_file = os.path.join(self.backup_dir, 'binlog_replay.sql')
-        with open(cmd_file, 'w') as f:
-            f.write("-- Binary log replay generated by python_sql_backup\n")
-            
-            # Add SET statements for specific tables if needed
-            if tables:
-                table_filter = '|'.join(tables)
-                f.write(f"SET @binlog_filter = '{table_filter}';\n")
-            
-            f.write("SET sql_log_bin = 0;\n")  # Disable binary logging during replay
+        # Replay in binlog sequence order; compare the number numerically so that
+        # mysql-bin.1000000 sorts after mysql-bin.999999
+        binlog_files = [files_by_name[name] for name in sorted(files_by_name, key=_binlog_sort_key)]
         
         try:
             # Build mysqlbinlog command
             cmd = ['mysqlbinlog']
             
             if start_time:
-                cmd.append(f"--start-datetime='{start_time.strftime('%Y-%m-%d %H:%M:%S')}'")
+                cmd.append(f"--start-datetime={start_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
             if end_time:
-                cmd.append(f"--stop-datetime='{end_time.strftime('%Y-%m-%d %H:%M:%S')}'")
+                cmd.append(f"--stop-datetime={end_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
             if tables:
                 # 提取数据库名称
@@ -427,29 +1317,43 @@ class RecoveryManager:
             # Add all binlog files
             cmd.extend(binlog_files)
             
-            # Redirect output to the command file
-            cmd.append(f">> {cmd_file}")
-            
-            # Execute mysqlbinlog
-            self.logger.info(f"Generating SQL from binary logs with command: {' '.join(cmd)}")
-            process = subprocess.run(' '.join(cmd), shell=True, check=True, capture_output=True, text=True)
-            
-            # Apply the generated SQL
-            db_config = self.config.get_section('DATABASE')
-            mysql_cmd = [
-                'mysql',
-                f"--host={db_config.get('host', 'localhost')}",
-                f"--port={db_config.get('port', '3306')}",
-                f"--user={db_config.get('user', 'root')}"
-            ]
+            # Build mysql command; binary logging is disabled for the replay session.
+            # mysql's stdin is mysqlbinlog's stdout, so the SET is sent with
+            # --init-command rather than written ahead of the stream.
+            db_config = self._db_config
+            mysql_cmd = ['mysql', *self._mysql_args_base, '--init-command=SET sql_log_bin = 0']
             
+            # Pass the password through the environment so it does not show up in ps output
+            mysql_env = None
             if 'password' in db_config and db_config['password']:
-                mysql_cmd.append(f"--password={db_config['password']}")
+                mysql_env = dict(os.environ, MYSQL_PWD=db_config['password'])
             
-            mysql_cmd.append(f"< {cmd_file}")
+            # Stream mysqlbinlog output straight into mysql, without an intermediate SQL file.
+            # mysqlbinlog's stderr goes to a temporary file: a pipe nobody reads until mysql
+            # finishes would block mysqlbinlog once it fills up, and mysql would wait forever.
+            self.logger.info(f"Applying binary log changes to the database with command: {shlex.join(cmd)}")
+            with tempfile.TemporaryFile() as binlog_err_file, subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=binlog_err_file, pipesize=PIPE_SIZE
+            ) as binlog_proc:
+                mysql_proc = subprocess.Popen(
+                    mysql_cmd, stdin=binlog_proc.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                    env=mysql_env
+                )
+                # Let mysqlbinlog get SIGPIPE if mysql exits early
+                binlog_proc.stdout.close()
+                _, mysql_err = mysql_proc.communicate()
+                binlog_proc.wait()
+                binlog_err_file.seek(0)
+                binlog_err = binlog_err_file.read()
             
-            self.logger.info("Applying binary log changes to the database")
-            process = subprocess.run(' '.join(mysql_cmd), shell=True, check=True, capture_output=True, text=True)
+            if binlog_proc.returncode != 0:
+                raise subprocess.CalledProcessError(
+                    binlog_proc.returncode, 'mysqlbinlog', stderr=binlog_err.decode(errors='replace')
+                )
+            if mysql_proc.returncode != 0:
+                raise subprocess.CalledProcessError(
+                    mysql_proc.returncode, 'mysql', stderr=mysql_err.decode(errors='replace')
+                )
             
             self.logger.info("Binary log application completed successfully")
             
@@ -457,10 +1361,6 @@ class RecoveryManager:
             self.logger.error(f"Binary log application failed: {e}")
             self.logger.error(f"Error output: {e.stderr}")
             raise RuntimeError(f"Binary log application failed: {e}")
-        finally:
-            # Clean up the command file
-            if os.path.exists(cmd_file):
-                os.remove(cmd_file)
     
     def restore_full_backup(
         self, 
@@ -483,20 +1383,23 @@ class RecoveryManager:
         self.logger.info(f"Starting restoration of full backup from {backup_path}")
         
         try:
+            # Prepare the backup first, MySQL keeps running on the old data until it succeeds
+            self._prepare_backup(backup_path)
+            
             # Backup existing data if requested
             if backup_existing:
-                self._backup_existing_data()
-            
-            # Prepare the backup
-            self._prepare_backup(backup_path)
+                # A partial restore keeps the other tables, so only a full one may move the datadir away
+                self._backup_existing_data(move=not specific_tables)
             
             # Restore the backup
             self._restore_backup(backup_path, specific_tables=specific_tables)
+            self._moved_datadir_to = None
             
             self.logger.info("Full backup restoration completed successfully")
             
         except Exception as e:
             self.logger.error(f"Full backup restoration failed: {e}")
+            self._undo_datadir_move()
             raise
     
     def restore_incremental_backup(
@@ -519,43 +1422,69 @@ class RecoveryManager:
             self.logger.error(f"Full backup path {full_backup_path} does not exist")
             raise FileNotFoundError(f"Full backup path {full_backup_path} does not exist")
         
+        # Check the incrementals with one directory listing per parent directory
+        paths_by_parent: Dict[str, List[Tuple[str, str]]] = {}
         for path in incremental_paths:
-            if not os.path.exists(path):
-                self.logger.error(f"Incremental backup path {path} does not exist")
-                raise FileNotFoundError(f"Incremental backup path {path} does not exist")
+            parent, name = os.path.split(os.path.normpath(path))
+            paths_by_parent.setdefault(parent, []).append((name, path))
+        
+        for parent, children in paths_by_parent.items():
+            # Same result as os.path.exists: a dangling symlink or an unreadable parent counts as missing
+            try:
+                with os.scandir(parent or '.') as it:
+                    names = {entry.name for entry in it if not entry.is_symlink() or os.path.exists(entry.path)}
+            except OSError:
+                names = set()
+            
+            for name, path in children:
+                if name not in names:
+                    self.logger.error(f"Incremental backup path {path} does not exist")
+                    raise FileNotFoundError(f"Incremental backup path {path} does not exist")
         
         self.logger.info(f"Starting restoration of full backup with {len(incremental_paths)} incremental backups")
         
         try:
-            # Backup existing data if requested
-            if backup_existing:
-                self._backup_existing_data()
-            
             # Create a copy of the full backup to work with
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             tmp_restore_path = os.path.join(self.backup_dir, f'tmp_restore_{timestamp}')
             
             # 如果是压缩文件，先解压
-            if full_backup_path.endswith('.tar.gz'):
+            if full_backup_path.endswith(ARCHIVE_SUFFIXES):
                 full_backup_path = self._uncompress_backup(full_backup_path)
             
+            # xtrabackup --prepare rewrites data files in place, so the working copy must
+            # not share inodes with the original (hardlinks would corrupt the full backup).
+            # On btrfs/XFS each file is cloned copy-on-write (_reflink_or_copy), which is as cheap as a
+            # hardlink but keeps the original intact.
             self.logger.info(f"Creating a copy of the full backup to {tmp_restore_path}")
-            shutil.copytree(full_backup_path, tmp_restore_path)
+            _parallel_copytree(full_backup_path, tmp_restore_path, self.threads)
             
             # Prepare the backup with incrementals
             self._prepare_incremental_backup(tmp_restore_path, incremental_paths)
             
+            # Backup existing data if requested, only now that the prepared backup is ready
+            if backup_existing:
+                # A partial restore keeps the other tables, so only a full one may move the datadir away
+                self._backup_existing_data(move=not specific_tables)
+            
             # Restore the prepared backup
             self._restore_backup(tmp_restore_path, specific_tables=specific_tables)
+            self._moved_datadir_to = None
             
-            # Clean up the temporary directory
+            # Clean up the temporary directory: move it aside and delete it in the background
+            trash_path = f"{tmp_restore_path}.trash"
             self.logger.info(f"Cleaning up temporary directory {tmp_restore_path}")
-            shutil.rmtree(tmp_restore_path)
+            os.rename(tmp_restore_path, trash_path)
+            threading.Thread(
+                target=shutil.rmtree, args=(trash_path,), kwargs={'ignore_errors': True},
+                name='tmp-restore-cleanup'
+            ).start()
             
             self.logger.info("Incremental backup restoration completed successfully")
             
         except Exception as e:
             self.logger.error(f"Incremental backup restoration failed: {e}")
+            self._undo_datadir_move()
             raise
     
     def restore_to_point_in_time(
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+测试公共基类模块
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from python_sql_backup.config.config_manager import ConfigManager
+from python_sql_backup.utils.common import get_mysql_pool
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """使用测试数据库的测试基类，子类通过 test_db 指定测试数据库名"""
+
+    test_db = None
+
+    @classmethod
+    def setUpClass(cls):
+        """测试类准备"""
+        # 读取测试配置文件
+        test_config_path = os.path.join(os.path.dirname(__file__), 'test_config.ini')
+        if not os.path.exists(test_config_path):
+            raise FileNotFoundError(f"测试配置文件不存在: {test_config_path}")
+        
+        cls.config = ConfigManager(test_config_path)
+        
+        # 整个测试类共用一个小连接池，避免每次操作都重新建立连接
+        cls.pool = get_mysql_pool(cls.config, pool_name=cls.test_db, size=2)
+        
+        # 测试目录
+        cls.test_backup_dir = cls.config.get('BACKUP', 'backup_dir')
+        
+        # 测试数据库和表只创建一次
+        cls._create_test_data()
+        
+    @classmethod
+    def tearDownClass(cls):
+        """测试类清理"""
+        # 清理测试数据库
+        cls._cleanup_test_data()
+        
+    @classmethod
+    def _create_test_data(cls):
+        """创建测试数据库和表"""
+        connection = cls.pool.get_connection()
+        
+        try:
+            with connection.cursor() as cursor:
+                # 创建测试数据库
+                cursor.execute(f"CREATE DATABASE IF NOT EXISTS {cls.test_db}")
+                cursor.execute(f"USE {cls.test_db}")
+        
+                # 创建测试表
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS test_table (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        name VARCHAR(100),
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+        
+            connection.commit()
+        finally:
+            connection.close()
+        
+    @classmethod
+    def _reset_test_data(cls):
+        """将测试表恢复为初始的3条测试数据"""
+        connection = cls.pool.get_connection()
+        
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"USE {cls.test_db}")
+                cursor.execute("TRUNCATE TABLE test_table")
+        
+                # 插入测试数据
+                cursor.executemany(
+                    "INSERT INTO test_table (name) VALUES (%s)",
+                    [('test1',), ('test2',), ('test3',)]
+                )
+        
+            connection.commit()
+        finally:
+            connection.close()
+        
+    @classmethod
+    def _cleanup_test_data(cls):
+        """清理测试数据"""
+        connection = cls.pool.get_connection()
+        
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP DATABASE IF EXISTS {cls.test_db}")
+            connection.commit()
+        finally:
+            connection.close()
+        
+    def _modify_test_data(self):
+        """修改测试数据（新增2条记录）"""
+        connection = self.pool.get_connection()
+        
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"USE {self.test_db}")
+                cursor.executemany(
+                    "INSERT INTO test_table (name) VALUES (%s)",
+                    [('test4',), ('test5',)]
+                )
+            connection.commit()
+        finally:
+            connection.close()
@@ -4,94 +4,38 @@
 """
 import os
 import sys
-import shutil
 import unittest
 from datetime import datetime
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from python_sql_backup.config.config_manager import ConfigManager
+from python_sql_backup.utils.common import fast_rmtree
+from python_sql_backup.tests.base import DatabaseTestCase
 from python_sql_backup.backup.backup_manager import BackupManager
 
 
-class TestBackupManager(unittest.TestCase):
+class TestBackupManager(DatabaseTestCase):
     """备份管理器测试类"""
 
+    test_db = 'test_backup'
+
     def setUp(self):
         """测试前准备"""
-        # 读取测试配置文件
-        test_config_path = os.path.join(os.path.dirname(__file__), 'test_config.ini')
-        if not os.path.exists(test_config_path):
-            raise FileNotFoundError(f"测试配置文件不存在: {test_config_path}")
-            
-        self.config = ConfigManager(test_config_path)
-        
         # 测试目录
-        self.test_backup_dir = self.config.get('BACKUP', 'backup_dir')
-        if not os.path.exists(self.test_backup_dir):
-            os.makedirs(self.test_backup_dir)
+        os.makedirs(self.test_backup_dir, exist_ok=True)
             
         # 初始化备份管理器
         self.backup_manager = BackupManager(self.config)
         
-        # 创建测试数据库和表
-        self._create_test_data()
+        # 重置测试数据
+        self._reset_test_data()
         
     def tearDown(self):
         """测试后清理"""
-        # 清理测试数据库
-        self._cleanup_test_data()
-        
         # 清理测试备份目录
         if os.path.exists(self.test_backup_dir):
-            shutil.rmtree(self.test_backup_dir)
-            
-    def _create_test_data(self):
-        """创建测试数据"""
-        import mysql.connector
-        
-        db_config = self.config.get_section('DATABASE')
-        connection = mysql.connector.connect(**db_config)
-        
-        try:
-            with connection.cursor() as cursor:
-                # 创建测试数据库
-                cursor.execute("CREATE DATABASE IF NOT EXISTS test_backup")
-                cursor.execute("USE test_backup")
-                
-                # 创建测试表
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS test_table (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        name VARCHAR(100),
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # 插入测试数据
-                cursor.execute("""
-                    INSERT INTO test_table (name) VALUES 
-                    ('test1'), ('test2'), ('test3')
-                """)
-                
-            connection.commit()
-        finally:
-            connection.close()
+            fast_rmtree(self.test_backup_dir)
             
-    def _cleanup_test_data(self):
-        """清理测试数据"""
-        import mysql.connector
-        
-        db_config = self.config.get_section('DATABASE')
-        connection = mysql.connector.connect(**db_config)
-        
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("DROP DATABASE IF EXISTS test_backup")
-            connection.commit()
-        finally:
-            connection.close()
-        
     def test_full_backup(self):
         """测试全量备份功能"""
         # 执行备份
@@ -133,24 +77,6 @@ class TestBackupManager(unittest.TestCase):
         xtrabackup_info_path = os.path.join(inc_path, 'xtrabackup_info')
         self.assertTrue(os.path.exists(xtrabackup_info_path))
         
-    def _modify_test_data(self):
-        """修改测试数据用于增量备份测试"""
-        import mysql.connector
-        
-        db_config = self.config.get_section('DATABASE')
-        connection = mysql.connector.connect(**db_config)
-        
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("USE test_backup")
-                cursor.execute("""
-                    INSERT INTO test_table (name) VALUES 
-                    ('test4'), ('test5')
-                """)
-            connection.commit()
-        finally:
-            connection.close()
-        
     def test_list_backups(self):
         """测试列出备份功能"""
         # 创建一些测试备份
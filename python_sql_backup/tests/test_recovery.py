@@ -11,99 +11,76 @@ import time
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from python_sql_backup.config.config_manager import ConfigManager
+from python_sql_backup.tests.base import DatabaseTestCase
 from python_sql_backup.backup.backup_manager import BackupManager
 from python_sql_backup.recovery.recovery_manager import RecoveryManager
 
 
-class TestRecoveryManager(unittest.TestCase):
+class TestRecoveryManager(DatabaseTestCase):
     """恢复管理器测试类"""
 
-    def setUp(self):
-        """测试前准备"""
-        # 读取测试配置文件
-        test_config_path = os.path.join(os.path.dirname(__file__), 'test_config.ini')
-        if not os.path.exists(test_config_path):
-            raise FileNotFoundError(f"测试配置文件不存在: {test_config_path}")
-            
-        self.config = ConfigManager(test_config_path)
+    test_db = 'test_recovery'
+
+    @classmethod
+    def setUpClass(cls):
+        """测试类准备"""
+        super().setUpClass()
         
         # 测试目录
-        self.test_backup_dir = self.config.get('BACKUP', 'backup_dir')
-        if not os.path.exists(self.test_backup_dir):
-            os.makedirs(self.test_backup_dir)
+        os.makedirs(cls.test_backup_dir, exist_ok=True)
+            
+        # 初始化测试数据
+        cls._reset_test_data()
+        
+        # 所有测试共用一个全量备份（包含初始的3条记录）
+        cls.full_backup_result = BackupManager(cls.config).create_full_backup()
+        
+    @classmethod
+    def tearDownClass(cls):
+        """测试类清理"""
+        super().tearDownClass()
+        
+        # 清理测试备份目录（增量恢复在后台线程中删除 tmp_restore_*.trash，可能与此同时进行）
+        shutil.rmtree(cls.test_backup_dir, ignore_errors=True)
             
+    def setUp(self):
+        """测试前准备"""
         # 初始化备份和恢复管理器
         self.backup_manager = BackupManager(self.config)
         self.recovery_manager = RecoveryManager(self.config)
         
-        # 创建测试数据库和表
-        self._create_test_data()
-        
-        # 创建测试备份
-        self.full_backup_result = self.backup_manager.create_full_backup()
+        # 重置测试数据
+        self._reset_test_data()
         
     def tearDown(self):
         """测试后清理"""
-        # 清理测试数据库
-        self._cleanup_test_data()
+        # 删除本测试基于共享全量备份创建的增量备份
+        shutil.rmtree(os.path.join(self.full_backup_result['backup_path'], 'inc'), ignore_errors=True)
         
-        # 清理测试备份目录
-        if os.path.exists(self.test_backup_dir):
-            shutil.rmtree(self.test_backup_dir)
+        # 删除全量恢复用的备份副本
+        shutil.rmtree(self._full_backup_copy_path(), ignore_errors=True)
             
-    def _create_test_data(self):
-        """创建测试数据"""
-        import mysql.connector
-        
-        db_config = self.config.get_section('DATABASE')
-        connection = mysql.connector.connect(**db_config)
-        
-        try:
-            with connection.cursor() as cursor:
-                # 创建测试数据库
-                cursor.execute("CREATE DATABASE IF NOT EXISTS test_recovery")
-                cursor.execute("USE test_recovery")
-                
-                # 创建测试表
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS test_table (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        name VARCHAR(100),
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # 插入测试数据
-                cursor.execute("""
-                    INSERT INTO test_table (name) VALUES 
-                    ('test1'), ('test2'), ('test3')
-                """)
-                
-            connection.commit()
-        finally:
-            connection.close()
-            
-    def _cleanup_test_data(self):
-        """清理测试数据"""
-        import mysql.connector
-        
-        db_config = self.config.get_section('DATABASE')
-        connection = mysql.connector.connect(**db_config)
-        
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("DROP DATABASE IF EXISTS test_recovery")
-            connection.commit()
-        finally:
-            connection.close()
+    def _full_backup_copy_path(self):
+        """共享全量备份副本的路径"""
+        return os.path.join(self.test_backup_dir, f'full_copy_{self._testMethodName}')
+        
+    def _copy_full_backup(self):
+        """
+        复制共享的全量备份
+        
+        全量恢复会就地prepare备份，之后就不能再在它上面应用增量备份，
+        所以全量恢复的测试只使用副本。
+        
+        Returns:
+            副本的路径
+        """
+        copy_path = self._full_backup_copy_path()
+        shutil.copytree(self.full_backup_result['backup_path'], copy_path)
+        return copy_path
             
     def _get_table_data(self):
         """获取测试表数据"""
-        import mysql.connector
-        
-        db_config = self.config.get_section('DATABASE')
-        connection = mysql.connector.connect(**db_config)
+        connection = self.pool.get_connection()
         
         try:
             with connection.cursor() as cursor:
@@ -121,7 +98,7 @@ class TestRecoveryManager(unittest.TestCase):
         
         # 执行恢复
         self.recovery_manager.restore_full_backup(
-            self.full_backup_result['backup_path'],
+            self._copy_full_backup(),
             backup_existing=True
         )
         
@@ -164,7 +141,7 @@ class TestRecoveryManager(unittest.TestCase):
         
         # 执行指定表的恢复
         self.recovery_manager.restore_full_backup(
-            self.full_backup_result['backup_path'],
+            self._copy_full_backup(),
             backup_existing=True,
             specific_tables=['test_recovery.test_table']
         )
@@ -174,75 +151,47 @@ class TestRecoveryManager(unittest.TestCase):
         self.assertNotEqual(original_data, restored_data)
         self.assertEqual(len(restored_data), 3)  # 初始的3条记录
         
-    def _modify_test_data(self):
-        """修改测试数据"""
-        import mysql.connector
-        
-        db_config = self.config.get_section('DATABASE')
-        connection = mysql.connector.connect(**db_config)
-        
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("USE test_recovery")
-                cursor.execute("""
-                    INSERT INTO test_table (name) VALUES 
-                    ('test4'), ('test5')
-                """)
-            connection.commit()
-        finally:
-            connection.close()
-            
     def _modify_test_data_again(self):
         """再次修改测试数据"""
-        import mysql.connector
-        
-        db_config = self.config.get_section('DATABASE')
-        connection = mysql.connector.connect(**db_config)
+        connection = self.pool.get_connection()
         
         try:
             with connection.cursor() as cursor:
                 cursor.execute("USE test_recovery")
-                cursor.execute("""
-                    INSERT INTO test_table (name) VALUES 
-                    ('test6'), ('test7')
-                """)
+                cursor.executemany(
+                    "INSERT INTO test_table (name) VALUES (%s)",
+                    [('test6',), ('test7',)]
+                )
                 cursor.execute("UPDATE test_table SET name = 'modified' WHERE id = 1")
             connection.commit()
         finally:
             connection.close()
             
+    @staticmethod
+    def _wait_for_next_second():
+        """等待到下一整秒开始"""
+        time.sleep(1 - datetime.now().microsecond / 1_000_000)
+        
     def test_point_in_time_recovery(self):
         """测试时间点恢复功能"""
         # 记录开始时间
         start_time = datetime.now()
         
-        # 等待1秒以确保时间戳不同
-        time.sleep(1)
-        
         # 修改数据并创建增量备份
         self._modify_test_data()
         inc_result = self.backup_manager.create_incremental_backup(
             self.full_backup_result['backup_path']
         )
         
-        # 等待1秒
-        time.sleep(1)
+        # mysqlbinlog 按秒过滤，中间时间点须与之前的修改不在同一秒内
+        self._wait_for_next_second()
         
         # 记录中间时间点
         middle_time = datetime.now()
         
-        # 等待1秒
-        time.sleep(1)
-        
-        # 再次修改数据
+        # 再次修改数据（在middle_time之后，不应被恢复）
         self._modify_test_data_again()
         
-        # 等待1秒
-        time.sleep(1)
-        
-        # 记录结束时间
-        end_time = datetime.now()
-        
         # 执行时间点恢复到middle_time
         self.recovery_manager.restore_to_point_in_time(
             start_time,
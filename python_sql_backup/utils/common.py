@@ -4,12 +4,27 @@ Common utility functions for MySQL backup and recovery.
 import os
 import re
 import logging
-import mysql.connector
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from shutil import which
+from typing import Callable, Collection, Dict, Any, Optional, List, Sequence, Tuple
 
 from python_sql_backup.config.config_manager import ConfigManager
 
 
+# Suffixes of archived (tar + gzip/zstd) backups
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tar.zst')
+
+# Log record format used by setup_logger
+_FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# Units used by format_size
+_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Characters that are invalid in filenames
+_INVALID_FN_CHARS = re.compile(r'[<>:"/\\|?*]')
+
+
 def ensure_dir(directory: str) -> None:
     """
     Ensure a directory exists, creating it if necessary.
@@ -17,8 +32,56 @@ def ensure_dir(directory: str) -> None:
     Args:
         directory: Path to the directory.
     """
-    if not os.path.exists(directory):
-        os.makedirs(directory, exist_ok=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def strip_archive_suffix(path: str) -> str:
+    """
+    Strip the archive suffix from a backup path.
+    
+    Args:
+        path: Path to an archived backup.
+        
+    Returns:
+        The path without its archive suffix, unchanged if it has none.
+    """
+    for suffix in ARCHIVE_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def _db_params(config: ConfigManager) -> Dict[str, Any]:
+    """
+    Build the MySQL connection parameters from the configuration.
+    
+    The parameters are built once and kept on the config instance.
+    
+    Args:
+        config: Configuration manager instance.
+        
+    Returns:
+        Keyword arguments for mysql.connector.connect().
+    """
+    connection_params = getattr(config, '_cached_db_params', None)
+    if connection_params is None:
+        db_config = config.get_section('DATABASE')
+        
+        connection_params = {
+            'host': db_config.get('host', 'localhost'),
+            'port': int(db_config.get('port', '3306')),
+            'user': db_config.get('user', 'root')
+        }
+        
+        if db_config.get('password'):
+            connection_params['password'] = db_config['password']
+        
+        if db_config.get('socket'):
+            connection_params['unix_socket'] = db_config['socket']
+        
+        config._cached_db_params = connection_params
+    
+    return connection_params
 
 
 def get_mysql_connection(config: ConfigManager):
@@ -31,21 +94,37 @@ def get_mysql_connection(config: ConfigManager):
     Returns:
         MySQL connection object.
     """
-    db_config = config.get_section('DATABASE')
-    
-    connection_params = {
-        'host': db_config.get('host', 'localhost'),
-        'port': int(db_config.get('port', '3306')),
-        'user': db_config.get('user', 'root')
-    }
+    # Imported on first use so commands that never connect don't pay for the driver
+    import mysql.connector
     
-    if 'password' in db_config and db_config['password']:
-        connection_params['password'] = db_config['password']
+    return mysql.connector.connect(**_db_params(config))
+
+
+def get_mysql_pool(config: ConfigManager, pool_name: str = 'psb', size: int = 5):
+    """
+    Get a MySQL connection pool based on the configuration.
     
-    if 'socket' in db_config and db_config['socket']:
-        connection_params['unix_socket'] = db_config['socket']
+    The pool is created on first use and kept on the config instance, so
+    repeated callers share its connections instead of reconnecting.
     
-    return mysql.connector.connect(**connection_params)
+    Args:
+        config: Configuration manager instance.
+        pool_name: Name of the pool.
+        size: Number of pooled connections.
+        
+    Returns:
+        MySQLConnectionPool instance; get_connection() borrows a connection
+        and close() returns it to the pool.
+    """
+    pool = getattr(config, '_mysql_pool', None)
+    if pool is None:
+        import mysql.connector.pooling
+        
+        pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_name=pool_name, pool_size=size, **_db_params(config)
+        )
+        config._mysql_pool = pool
+    return pool
 
 
 def parse_table_filter(table_filter: str) -> List[str]:
@@ -65,6 +144,60 @@ def parse_table_filter(table_filter: str) -> List[str]:
     return [pattern.strip() for pattern in table_filter.split(',')]
 
 
+def _table_pattern_regex(pattern: str) -> str:
+    """
+    Translate a table pattern into a regular expression.
+    
+    Args:
+        pattern: Table pattern, e.g. "db1.table1" or "db2.*".
+        
+    Returns:
+        Regular expression source matching the same table names.
+    """
+    # A '*' part stands for any db or table name, which never contains a '.';
+    # a '*' inside a name (e.g. "db.order*") is literal
+    return r'\.'.join('[^.]*' if part == '*' else re.escape(part) for part in pattern.split('.'))
+
+
+def compile_table_matcher(patterns: Sequence[str]) -> Callable[[str], bool]:
+    """
+    Compile table patterns into a single matcher function.
+    
+    Use this instead of match_table when filtering many tables against the
+    same patterns.
+    
+    Args:
+        patterns: List of patterns to match against.
+        
+    Returns:
+        Function that returns True if a table name (db.table) matches any pattern.
+    """
+    if not patterns:
+        return lambda table_name: True  # If no patterns, match everything
+    
+    # Only a db.table pattern whose db or table part is exactly '*' is a wildcard;
+    # all other patterns (a bare '*' included) also match their literal name, a set lookup is enough
+    wildcards = [pattern for pattern in patterns if '.' in pattern and '*' in pattern.split('.')]
+    exact = frozenset(patterns).difference(wildcards)
+    regexes = [_table_pattern_regex(pattern) for pattern in wildcards]
+    match = re.compile('|'.join(regexes)).fullmatch if regexes else None
+    # A bare '*' matches every db.table name
+    match_all = '*' in patterns
+    
+    def matcher(table_name: str) -> bool:
+        if table_name in exact or (match_all and '.' in table_name):
+            return True
+        return match is not None and match(table_name) is not None
+    
+    return matcher
+
+
+@lru_cache(maxsize=8)
+def _cached_table_matcher(patterns: Tuple[str, ...]) -> Callable[[str], bool]:
+    """Compile and cache a matcher for match_table."""
+    return compile_table_matcher(patterns)
+
+
 def match_table(table_name: str, patterns: List[str]) -> bool:
     """
     Check if a table name matches any of the patterns.
@@ -79,20 +212,7 @@ def match_table(table_name: str, patterns: List[str]) -> bool:
     if not patterns:
         return True  # If no patterns, match everything
     
-    for pattern in patterns:
-        # Handle wildcard patterns
-        if '.' in pattern:
-            db, table = pattern.split('.')
-            if '.' in table_name:
-                t_db, t_table = table_name.split('.')
-                if (db == '*' or db == t_db) and (table == '*' or table == t_table):
-                    return True
-        else:
-            # Pattern without db part
-            if pattern == table_name or (pattern == '*' and '.' in table_name):
-                return True
-    
-    return False
+    return _cached_table_matcher(tuple(patterns))(table_name)
 
 
 def sanitize_filename(name: str) -> str:
@@ -106,7 +226,7 @@ def sanitize_filename(name: str) -> str:
         Sanitized filename.
     """
     # Replace characters that are invalid in filenames
-    return re.sub(r'[<>:"/\\|?*]', '_', name)
+    return _INVALID_FN_CHARS.sub('_', name)
 
 
 def format_size(size_bytes: int) -> str:
@@ -121,23 +241,94 @@ def format_size(size_bytes: int) -> str:
     """
     if size_bytes == 0:
         return "0 B"
+    
+    # Each unit is 2**10 times the previous one, so the index follows from the bit length
+    # (clamped at 0 for fractional sizes below one byte)
+    i = min(len(_UNITS) - 1, max(0, (int(size_bytes).bit_length() - 1) // 10)) if size_bytes > 0 else 0
+    
+    return f"{size_bytes / (1 << (10 * i)):.2f} {_UNITS[i]}"
+
+
+def _walk_size(path: str) -> int:
+    """
+    Sum the sizes of all files below a directory.
+    
+    Args:
+        path: Path to the directory.
         
-    # Define units and their respective sizes
-    units = ['B', 'KB', 'MB', 'GB', 'TB', 'PB']
-    size = float(size_bytes)
-    i = 0
+    Returns:
+        Total size in bytes.
+    """
+    total_size = 0
+    stack = [path]
     
-    while size >= 1024.0 and i < len(units) - 1:
-        size /= 1024.0
-        i += 1
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                    except FileNotFoundError:
+                        # Removed while we were walking
+                        continue
+        except OSError:
+            # Unreadable or vanished directory, like os.walk skip it
+            continue
     
-    return f"{size:.2f} {units[i]}"
+    return total_size
 
 
-def get_directory_size(path: str) -> int:
+def get_directory_size(path: str, exclude: Collection[str] = ()) -> int:
     """
     Get the total size of a directory in bytes.
     
+    Subdirectories are sized in parallel when there are enough of them
+    (e.g. one per database in an xtrabackup backup).
+    
+    Args:
+        path: Path to the directory.
+        exclude: Names of top-level files and directories that are not counted.
+        
+    Returns:
+        Total size in bytes.
+    """
+    total_size = 0
+    subdirs = []
+    
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name in exclude:
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    else:
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                except FileNotFoundError:
+                    continue
+    except OSError:
+        return 0
+    
+    # A pool only pays off with a few directories to walk
+    if len(subdirs) < 4:
+        return total_size + sum(_walk_size(subdir) for subdir in subdirs)
+    
+    workers = min(32, (os.cpu_count() or 1) * 4, len(subdirs))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return total_size + sum(executor.map(_walk_size, subdirs))
+
+
+def get_flat_directory_size(path: str) -> int:
+    """
+    Get the total size of the files directly inside a directory.
+    
+    Binary log backups are flat, so a single scandir pass is enough and
+    the recursive walk in get_directory_size can be skipped.
+    
     Args:
         path: Path to the directory.
         
@@ -146,26 +337,92 @@ def get_directory_size(path: str) -> int:
     """
     total_size = 0
     
-    for dirpath, dirnames, filenames in os.walk(path):
-        for filename in filenames:
-            file_path = os.path.join(dirpath, filename)
-            if os.path.exists(file_path):
-                total_size += os.path.getsize(file_path)
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                except FileNotFoundError:
+                    # Removed while we were listing
+                    continue
+    except OSError:
+        # Unreadable or vanished directory, like _walk_size skip it
+        return 0
     
     return total_size
 
 
+def fast_rmtree(path: str) -> None:
+    """
+    Remove a directory tree with plain unlink/rmdir calls.
+    
+    Unlike shutil.rmtree there is no error callback and no protection against
+    the tree being changed concurrently, so only use it on trees nobody else
+    touches (e.g. test or scratch directories). Symlinks are removed, not followed.
+    
+    Args:
+        path: Directory to remove.
+    """
+    dirs = [path]
+    stack = [path]
+    
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                    stack.append(entry.path)
+                else:
+                    os.unlink(entry.path)
+    
+    # Children were appended after their parents
+    for directory in reversed(dirs):
+        os.rmdir(directory)
+
+
+def run_parallel(func: Callable[[Any], Any], items: Sequence[Any], max_workers: int) -> List[Optional[Exception]]:
+    """
+    Call a function on every item concurrently in a thread pool.
+    
+    Meant for I/O-bound work such as deleting directories or waiting on
+    external commands, where threads overlap the blocking system calls.
+    
+    Args:
+        func: Function taking a single item.
+        items: Items to process.
+        max_workers: Maximum number of concurrent calls.
+        
+    Returns:
+        For each item, in order, the exception its call raised or None.
+    """
+    def call(item: Any) -> Optional[Exception]:
+        try:
+            func(item)
+        except Exception as e:
+            return e
+        return None
+    
+    if max_workers <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(call, items))
+
+
+@lru_cache(maxsize=None)
 def is_tool_available(name: str) -> bool:
     """
     Check if a command-line tool is available.
     
+    The result is cached for the lifetime of the process.
+    
     Args:
         name: Name of the tool.
         
     Returns:
         True if the tool is available, False otherwise.
     """
-    from shutil import which
     return which(name) is not None
 
 
@@ -173,6 +430,8 @@ def setup_logger(name: str, log_file: Optional[str] = None, level: int = logging
     """
     Set up a logger.
     
+    Calling it again for the same name returns the logger unchanged.
+    
     Args:
         name: Name of the logger.
         log_file: Path to the log file.
@@ -182,21 +441,27 @@ def setup_logger(name: str, log_file: Optional[str] = None, level: int = logging
         Logger instance.
     """
     logger = logging.getLogger(name)
-    logger.setLevel(level)
     
-    # Create formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Already set up by an earlier call, don't add a second set of handlers
+    if logger.handlers:
+        return logger
+    
+    logger.setLevel(level)
+    logger.propagate = False
     
     # Create console handler
     console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
     logger.addHandler(console_handler)
     
     # Create file handler if log_file is provided
     if log_file:
-        ensure_dir(os.path.dirname(log_file))
+        # A bare file name lives in the current directory, nothing to create
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            ensure_dir(log_dir)
         file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
+        file_handler.setFormatter(_FORMATTER)
         logger.addHandler(file_handler)
     
     return logger
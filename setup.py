@@ -5,8 +5,11 @@ from setuptools import setup, find_packages
 
 
 def read_requirements():
-    with open('requirements.txt') as f:
-        return f.read().splitlines()
+    with open('requirements.txt', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+_REQS = read_requirements()
 
 
 setup(
@@ -14,8 +17,8 @@ setup(
     version="1.0.0",
     description="MySQL backup and recovery solution using XtraBackup",
     author="Python SQL Backup Team",
-    packages=find_packages(),
-    install_requires=read_requirements(),
+    packages=find_packages(exclude=('python_sql_backup.tests', 'python_sql_backup.tests.*')),
+    install_requires=_REQS,
     entry_points={
         'console_scripts': [
             'python-sql-backup=python_sql_backup.cli.commands:cli',